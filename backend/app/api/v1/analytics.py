@@ -8,9 +8,10 @@ from app.schemas.analytics import (
     SpendingTrendResponse,
 )
 from app.schemas.daily_breakdown import DailyBreakdownResponse
+from app.schemas.dashboard import DashboardResponse
 from app.schemas.analysis_behavior import BehaviorAnalysisResponse
 from app.services.analytics import analytics_service
-from app.services.llm_analysis import generate_behavior_analysis
+from app.services.behavior_snapshot import behavior_snapshot_service
 
 router = APIRouter()
 
@@ -19,39 +20,64 @@ router = APIRouter()
 async def monthly_total(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(...),
+    include_projected: bool = Query(False),
     current_user: User = Depends(get_current_user),
 ):
     """Total spending for a given month (backend aggregation)."""
-    return await analytics_service.monthly_total(current_user.id, month, year)
+    return await analytics_service.monthly_total(
+        current_user.id, month, year, include_projected=include_projected
+    )
 
 
 @router.get("/by-category", response_model=CategoryDistributionResponse)
 async def by_category(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(...),
+    include_projected: bool = Query(False),
     current_user: User = Depends(get_current_user),
 ):
     """Spending by category for a given month (for charts)."""
-    return await analytics_service.category_distribution(current_user.id, month, year)
+    return await analytics_service.category_distribution(
+        current_user.id, month, year, include_projected=include_projected
+    )
 
 
 @router.get("/trends", response_model=SpendingTrendResponse)
 async def spending_trend(
     months: int = Query(12, ge=1, le=24),
+    include_projected: bool = Query(False),
     current_user: User = Depends(get_current_user),
 ):
     """Monthly totals for the last N months (spending trend)."""
-    return await analytics_service.spending_trend(current_user.id, months_back=months)
+    return await analytics_service.spending_trend(
+        current_user.id, months_back=months, include_projected=include_projected
+    )
 
 
 @router.get("/daily-breakdown", response_model=DailyBreakdownResponse)
 async def daily_breakdown(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(...),
+    include_projected: bool = Query(False),
     current_user: User = Depends(get_current_user),
 ):
     """Daily spending totals for a given month (calendar view)."""
-    return await analytics_service.daily_breakdown(current_user.id, month, year)
+    return await analytics_service.daily_breakdown(
+        current_user.id, month, year, include_projected=include_projected
+    )
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def dashboard(
+    month: int = Query(..., ge=1, le=12),
+    year: int = Query(...),
+    include_projected: bool = Query(False),
+    current_user: User = Depends(get_current_user),
+):
+    """Monthly total, category distribution, daily breakdown and budgets in one response."""
+    return await analytics_service.dashboard(
+        current_user.id, month, year, include_projected=include_projected
+    )
 
 
 @router.get("/behavior", response_model=BehaviorAnalysisResponse)
@@ -63,5 +89,6 @@ async def behavior_analysis(
     """
     LLM-powered spending behavior analysis.
     Detects spending spikes, lifestyle patterns, and trends.
+    Closed months are served from the nightly precomputed result when available.
     """
-    return await generate_behavior_analysis(current_user.id, month, year)
+    return await behavior_snapshot_service.get(current_user.id, month, year)
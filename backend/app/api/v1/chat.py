@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from contextlib import aclosing
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.services.llm_analysis import _call_llm
-from app.services.analytics import analytics_service
+from app.services.llm_analysis import _call_llm, _stream_llm
+from app.services.chat_context import chat_context_service
 
 router = APIRouter()
 
@@ -23,35 +28,16 @@ class ChatResponse(BaseModel):
     response: str
 
 
-@router.post("/financial-advice", response_model=ChatResponse)
-async def financial_advice(
-    request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Get financial advice from AI advisor based on user's question.
-    Optionally uses user's spending data for personalized advice.
-    """
+async def _build_prompts(request: ChatRequest, current_user: User) -> tuple[str, str]:
+    """System and user prompts for an advice request, including spending context."""
     try:
-        # Get user's recent spending data for context
-        current_month = __import__('datetime').datetime.now().month
-        current_year = __import__('datetime').datetime.now().year
-        
-        monthly_total = await analytics_service.monthly_total(
-            current_user.id, current_month, current_year
+        # Current month totals, top categories and budget status (cached per user/month)
+        today = date.today()
+        spending_context = await chat_context_service.spending_context(
+            current_user.id, today.year, today.month
         )
-        category_dist = await analytics_service.category_distribution(
-            current_user.id, current_month, current_year
-        )
-        
-        # Build context about user's spending
-        spending_context = f"""
-User's current month (${current_month}/{current_year}):
-- Total spending: ₱{monthly_total.total:.2f}
-- Average daily spending: ₱{monthly_total.average_daily:.2f}
-- Top categories: {', '.join(f"{c.category_name} (₱{c.amount:.2f})" for c in category_dist.categories[:3])}
-"""
-    except Exception:
+    except Exception as e:
+        print(f"Chat context error: {e}")
         spending_context = ""
 
     # Build conversation history
@@ -73,7 +59,54 @@ Previous conversation:
 User's current question: {request.message}
 
 Provide helpful financial advice."""
+    return system_prompt, user_prompt
+
 
-    response_text = _call_llm(system_prompt, user_prompt)
+@router.post("/financial-advice", response_model=ChatResponse)
+async def financial_advice(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get financial advice from AI advisor based on user's question.
+    Optionally uses user's spending data for personalized advice.
+    """
+    system_prompt, user_prompt = await _build_prompts(request, current_user)
+
+    # Conversations are not cached: a repeated question should get a fresh answer
+    response_text = await _call_llm(system_prompt, user_prompt, use_cache=False, user_id=current_user.id)
     
     return ChatResponse(response=response_text)
+
+
+@router.post("/financial-advice/stream")
+async def financial_advice_stream(
+    request: ChatRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Same as /financial-advice, but streams the answer as Server-Sent Events.
+    Each event carries a JSON text delta; the stream ends with an [DONE] event.
+    Generation stops as soon as the client disconnects.
+    """
+    system_prompt, user_prompt = await _build_prompts(request, current_user)
+
+    async def events():
+        try:
+            # aclosing: stopping early closes the provider stream and frees the LLM slot now
+            async with aclosing(_stream_llm(system_prompt, user_prompt, user_id=current_user.id)) as deltas:
+                async for delta in deltas:
+                    if await http_request.is_disconnected():
+                        break
+                    yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            print(f"LLM stream error: {e}")
+            yield f"data: {json.dumps({'error': 'Unable to generate advice at this time.'})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
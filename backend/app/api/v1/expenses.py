@@ -1,36 +1,52 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
 
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
-from app.services.expense import expense_service
+from app.schemas.expense import (
+    ExpenseCreate,
+    ExpenseUpdate,
+    ExpenseResponse,
+    ExpenseBulkCreate,
+    ExpenseBulkCreateResponse,
+)
+from app.services.expense import encode_cursor, expense_service
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[ExpenseResponse])
 async def list_expenses(
+    response: Response,
     month: int | None = Query(None, ge=1, le=12),
     year: int | None = Query(None),
     category_id: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description="Keyset cursor from the X-Next-Cursor header"),
     current_user: User = Depends(get_current_user),
 ):
-    """List expenses for the current user. Optionally filter by month/year and category."""
+    """
+    List expenses for the current user. Optionally filter by month/year and category.
+    Pass the X-Next-Cursor header of a full page as cursor to fetch the next one.
+    """
     if month is not None and year is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="year is required when month is provided",
         )
-    return await expense_service.list_for_user(
+    expenses = await expense_service.list_for_user(
         current_user.id,
         month=month,
         year=year,
         category_id=category_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
+    if len(expenses) == limit:
+        last = expenses[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
+    return expenses
 
 
 @router.post("", response_model=ExpenseResponse, status_code=201)
@@ -42,6 +58,15 @@ async def create_expense(
     return await expense_service.create(current_user.id, payload)
 
 
+@router.post("/bulk", response_model=ExpenseBulkCreateResponse)
+async def create_expenses_bulk(
+    payload: ExpenseBulkCreate,
+    current_user: User = Depends(get_current_user),
+):
+    """Create up to 5000 expenses at once. Each item is reported as created or failed by its index."""
+    return await expense_service.create_bulk(current_user.id, payload.items)
+
+
 def _expense_to_response(e) -> ExpenseResponse:
     return ExpenseResponse(
         id=str(e.id),
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from app.api.deps import get_current_user
 from app.models.user import User
@@ -14,10 +14,9 @@ async def export_expenses_csv(
     year: int | None = Query(None),
     current_user: User = Depends(get_current_user),
 ):
-    """Export expenses as CSV. Optionally filter by month and year."""
-    content = await export_service.expenses_csv(current_user.id, month=month, year=year)
-    return Response(
-        content=content.encode("utf-8"),
+    """Export expenses as CSV (streamed). Optionally filter by month and year."""
+    return StreamingResponse(
+        export_service.expenses_csv(current_user.id, month=month, year=year),
         media_type="text/csv; charset=utf-8",
         headers={
             "Content-Disposition": "attachment; filename=expenses.csv",
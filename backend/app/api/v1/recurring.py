@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
 
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.schemas.recurring_rule import RecurringRuleCreate, RecurringRuleUpdate, RecurringRuleResponse
+from app.schemas.recurring_rule import (
+    ProjectedExpenseResponse,
+    RecurringRuleCreate,
+    RecurringRuleUpdate,
+    RecurringRuleResponse,
+)
 from app.services.recurring import recurring_service
 
 router = APIRouter()
@@ -23,6 +30,16 @@ async def create_recurring_rule(
     return await recurring_service.create(current_user.id, payload)
 
 
+@router.get("/projection", response_model=list[ProjectedExpenseResponse])
+async def project_recurring_expenses(
+    start: date = Query(...),
+    end: date = Query(...),
+    current_user: User = Depends(get_current_user),
+):
+    """Expenses the user's recurring rules will create between start and end (inclusive). Nothing is stored."""
+    return await recurring_service.projection(current_user.id, start, end)
+
+
 @router.get("/{rule_id}", response_model=RecurringRuleResponse)
 async def get_recurring_rule(
     rule_id: str,
@@ -44,5 +44,32 @@ class Settings(BaseSettings):
     BREVO_FROM_EMAIL: str | None = None
     BREVO_FROM_NAME: str = "Expense Tracker"
 
+    # Analytics result cache (per worker process)
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 2048
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300
+
+    # PDF export rendering pool (per worker process)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_USE_PROCESSES: bool = True
+
+    # Nightly behavior analysis precomputation
+    BEHAVIOR_PRECOMPUTE_HOUR_UTC: int = 2
+    BEHAVIOR_PRECOMPUTE_CONCURRENCY: int = 4
+
+    # Only the worker holding the scheduler lease runs scheduled jobs; it renews the
+    # lease every TTL/3 seconds and another worker takes over once it lapses
+    SCHEDULER_LEASE_TTL_SECONDS: int = 30
+
+    # Recurring expense processing: due rules handled per batch. Rules fire on time via
+    # an in-process timer; the sweep is a fallback for changes made in other workers
+    RECURRING_SWEEP_MINUTES: int = 60
+    RECURRING_BATCH_SIZE: int = 500
+    # Most missed occurrences backfilled per rule per run (guards against runaway rules)
+    RECURRING_MAX_CATCHUP: int = 366
+
+    # Spending context included in financial advice chat prompts
+    CHAT_CONTEXT_MAX_TOKENS: int = 250
+    CHAT_CONTEXT_TOP_CATEGORIES: int = 5
+
 
 settings = Settings()
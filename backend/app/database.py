@@ -1,5 +1,6 @@
 from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
 
 from app.config import settings
 from app.models.user import User
@@ -7,18 +8,63 @@ from app.models.category import Category
 from app.models.expense import Expense
 from app.models.budget import Budget
 from app.models.recurring_rule import RecurringRule
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.llm_cache import LlmCacheEntry
+from app.models.behavior_snapshot import BehaviorAnalysisSnapshot
+from app.models.scheduler_lease import SchedulerLease
+from app.models.migration_marker import MigrationMarker
+from app.services.recurring_dedupe import remove_duplicate_recurring_expenses
+from app.services.rollup import rollup_service
 
-document_models = [User, Category, Expense, Budget, RecurringRule]
+document_models = [
+    User,
+    Category,
+    Expense,
+    Budget,
+    RecurringRule,
+    MonthlyRollup,
+    LlmCacheEntry,
+    BehaviorAnalysisSnapshot,
+    SchedulerLease,
+    MigrationMarker,
+]
 _motor_client: AsyncIOMotorClient | None = None
 
+# Indexes replaced by a wider one; init_beanie only creates indexes, never drops them
+SUPERSEDED_INDEXES = {
+    "expenses": ["user_id_1_date_-1"],  # now (user_id, date, _id)
+}
+
+
+async def _drop_superseded_indexes(database: AsyncIOMotorDatabase) -> None:
+    for collection, names in SUPERSEDED_INDEXES.items():
+        existing = await database[collection].index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            try:
+                await database[collection].drop_index(name)
+                print(f"Dropped superseded index {collection}.{name}")
+            except OperationFailure:
+                pass  # another worker dropped it first
+
+
+async def init_database(database: AsyncIOMotorDatabase) -> None:
+    """Run pre-index cleanups, then initialise Beanie (which builds the indexes)."""
+    # Must run before init_beanie builds the unique (recurring_rule_id, date) index
+    deduped_users = await remove_duplicate_recurring_expenses(database)
+    await init_beanie(database=database, document_models=document_models)
+    await _drop_superseded_indexes(database)
+    # Before the first seed there is nothing to repair; ensure_seeded builds every user
+    if await rollup_service.is_seeded():
+        for user_id in deduped_users:
+            await rollup_service.rebuild(user_id)
+
 
 async def init_db() -> None:
     global _motor_client
     _motor_client = AsyncIOMotorClient(settings.MONGODB_URL)
-    await init_beanie(
-        database=_motor_client[settings.MONGODB_DB_NAME],
-        document_models=document_models,
-    )
+    await init_database(_motor_client[settings.MONGODB_DB_NAME])
 
 
 async def close_db() -> None:
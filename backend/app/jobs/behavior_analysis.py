@@ -0,0 +1,8 @@
+"""APScheduler job: precompute last month's behavior analysis for all active users."""
+from app.services.behavior_snapshot import behavior_snapshot_service, previous_month
+
+
+async def run_behavior_precompute_job() -> None:
+    """Store the previous month's analysis for every user with expenses in it. Call from AsyncIOScheduler."""
+    month, year = previous_month()
+    await behavior_snapshot_service.precompute(month, year)
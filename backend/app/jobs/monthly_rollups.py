@@ -0,0 +1,46 @@
+"""
+Rebuild or verify the monthly expense rollups from raw expenses.
+
+Usage:
+    python -m app.jobs.monthly_rollups verify [--user USER_ID]
+    python -m app.jobs.monthly_rollups rebuild [--user USER_ID]
+"""
+import argparse
+import asyncio
+import sys
+
+from beanie import PydanticObjectId
+
+from app.database import init_db, close_db
+from app.services.rollup import rollup_service
+
+
+async def _main(command: str, user_id: PydanticObjectId | None) -> int:
+    await init_db()
+    try:
+        if command == "rebuild":
+            written = await rollup_service.rebuild(user_id)
+            if user_id is None:
+                await rollup_service.mark_seeded()
+            print(f"Rebuilt {written} rollup rows")
+            return 0
+        drift = await rollup_service.verify(user_id)
+        for d in drift:
+            print(
+                f"{d['user_id']} {d['year']}-{d['month']:02d} {d['category_id']}: "
+                f"stored {d['stored_total']} ({d['stored_count']}), "
+                f"expected {d['expected_total']} ({d['expected_count']})"
+            )
+        print(f"{len(drift)} drifted rollup rows")
+        return 1 if drift else 0
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or verify monthly expense rollups.")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--user", help="Limit to one user id")
+    args = parser.parse_args()
+    user = PydanticObjectId(args.user) if args.user else None
+    sys.exit(asyncio.run(_main(args.command, user)))
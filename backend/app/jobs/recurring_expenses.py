@@ -1,8 +1,11 @@
-"""APScheduler job: create expenses from recurring rules that are due."""
-from app.services.recurring import recurring_service
+"""APScheduler job: safety sweep over recurring rules that are due."""
+from app.services.recurring_scheduler import recurring_scheduler
 from app.utils import utc_now
 
 
 async def run_recurring_expenses_job() -> None:
-    """Create expenses for all recurring rules that are due. Call from AsyncIOScheduler."""
-    await recurring_service.process_due(utc_now())
+    """
+    Create expenses for all recurring rules that are due and re-arm the rule timer.
+    Call from AsyncIOScheduler; rules normally fire on time through recurring_scheduler.
+    """
+    await recurring_scheduler.run_due(utc_now())
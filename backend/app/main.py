@@ -6,19 +6,53 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import init_db, close_db
 from app.api.v1 import router as api_v1_router
+from app.services.analytics import analytics_service
 from app.services.category import category_service
+from app.services.chat_context import chat_context_service
+from app.services.export import export_service, pdf_render_pool
+from app.services.llm_cache import llm_cache_stats
+from app.services.llm_analysis import llm_rate_limit_stats
+from app.services.leader_lease import scheduler_lease
+from app.services.recurring import recurring_service
+from app.services.recurring_scheduler import recurring_scheduler
+from app.services.rollup import rollup_service
 from app.jobs.recurring_expenses import run_recurring_expenses_job
+from app.jobs.behavior_analysis import run_behavior_precompute_job
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
     await category_service.seed_system()
+    await rollup_service.ensure_seeded()
+    # Every worker heartbeats the lease; only the current holder runs the jobs
+    await scheduler_lease.heartbeat()
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(run_recurring_expenses_job, "interval", hours=1)
+    scheduler.add_job(
+        scheduler_lease.heartbeat,
+        "interval",
+        seconds=max(settings.SCHEDULER_LEASE_TTL_SECONDS / 3, 1),
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        scheduler_lease.leader_only(run_recurring_expenses_job),
+        "interval",
+        minutes=settings.RECURRING_SWEEP_MINUTES,
+    )
+    scheduler.add_job(
+        scheduler_lease.leader_only(run_behavior_precompute_job),
+        "cron",
+        hour=settings.BEHAVIOR_PRECOMPUTE_HOUR_UTC,
+        timezone="UTC",
+    )
     scheduler.start()
+    recurring_scheduler.start(recurring_service.process_due)
     yield
+    await recurring_scheduler.stop()
     scheduler.shutdown(wait=False)
+    await scheduler_lease.release()
+    pdf_render_pool.shutdown()
     await close_db()
 
 
@@ -39,6 +73,7 @@ app.add_middleware(
     allow_credentials=not _allow_all,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(api_v1_router, prefix="/api/v1")
@@ -47,3 +82,17 @@ app.include_router(api_v1_router, prefix="/api/v1")
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """In-process cache and worker counters for this worker."""
+    return {
+        "analytics_cache": analytics_service.cache_stats(),
+        "chat_context_cache": chat_context_service.cache_stats(),
+        "pdf_render_pool": export_service.render_pool_stats(),
+        "llm_cache": llm_cache_stats(),
+        "llm_rate_limit": llm_rate_limit_stats(),
+        "scheduler_lease": scheduler_lease.stats(),
+        "recurring_scheduler": recurring_scheduler.stats(),
+    }
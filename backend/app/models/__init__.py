@@ -3,5 +3,10 @@ from app.models.category import Category
 from app.models.expense import Expense
 from app.models.budget import Budget
 from app.models.recurring_rule import RecurringRule
+from app.models.monthly_rollup import MonthlyRollup
+from app.models.llm_cache import LlmCacheEntry
+from app.models.behavior_snapshot import BehaviorAnalysisSnapshot
+from app.models.scheduler_lease import SchedulerLease
+from app.models.migration_marker import MigrationMarker
 
-__all__ = ["User", "Category", "Expense", "Budget", "RecurringRule"]
+__all__ = ["User", "Category", "Expense", "Budget", "RecurringRule", "MonthlyRollup", "LlmCacheEntry", "BehaviorAnalysisSnapshot", "SchedulerLease", "MigrationMarker"]
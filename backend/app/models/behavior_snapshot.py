@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any
+
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
+from pydantic import Field
+
+from app.utils import utc_now
+
+
+class BehaviorAnalysisSnapshot(Document):
+    """Precomputed BehaviorAnalysisResponse for one user and closed month."""
+    user_id: PydanticObjectId
+    year: int
+    month: int = Field(ge=1, le=12)
+    result: dict[str, Any]
+    created_at: datetime = Field(default_factory=utc_now)
+
+    class Settings:
+        name = "behavior_analysis_snapshots"
+        indexes = [
+            IndexModel([("user_id", 1), ("year", 1), ("month", 1)], unique=True),
+        ]
+
+    class Config:
+        populate_by_name = True
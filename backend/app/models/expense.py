@@ -3,6 +3,7 @@ from decimal import Decimal
 from typing import Annotated
 
 from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
 from pydantic import BeforeValidator, Field
 
 from app.utils import decimal_from_bson, utc_now
@@ -25,8 +26,14 @@ class Expense(Document):
     class Settings:
         name = "expenses"
         indexes = [
-            [("user_id", 1), ("date", -1)],
+            [("user_id", 1), ("date", -1), ("_id", -1)],
             [("user_id", 1), ("category_id", 1)],
+            # At most one generated expense per recurring rule and date
+            IndexModel(
+                [("recurring_rule_id", 1), ("date", 1)],
+                unique=True,
+                partialFilterExpression={"recurring_rule_id": {"$type": "objectId"}},
+            ),
         ]
 
     class Config:
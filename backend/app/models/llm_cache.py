@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from beanie import Document, Indexed
+from pymongo import IndexModel
+from pydantic import Field
+
+from app.utils import utc_now
+
+
+class LlmCacheEntry(Document):
+    """Stored LLM completion keyed by a fingerprint of (model, prompts, temperature)."""
+    key: Indexed(str, unique=True)
+    model: str
+    response: str
+    total_tokens: int = 0
+    created_at: datetime = Field(default_factory=utc_now)
+    expires_at: datetime | None = None  # None = keep indefinitely
+
+    class Settings:
+        name = "llm_cache"
+        indexes = [
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+        ]
+
+    class Config:
+        populate_by_name = True
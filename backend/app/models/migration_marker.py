@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from beanie import Document, Indexed
+from pydantic import Field
+
+from app.utils import utc_now
+
+
+class MigrationMarker(Document):
+    """Records that a one-off data migration (e.g. the first rollup build) has completed."""
+    name: Indexed(str, unique=True)
+    completed_at: datetime = Field(default_factory=utc_now)
+
+    class Settings:
+        name = "migration_markers"
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,34 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Annotated
+
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
+from pydantic import BeforeValidator, Field
+
+from app.utils import decimal_from_bson, utc_now
+
+DecimalAmount = Annotated[Decimal, BeforeValidator(decimal_from_bson)]
+
+
+class MonthlyRollup(Document):
+    """Per-user, per-month, per-category expense sum and count, kept current with $inc."""
+    user_id: PydanticObjectId
+    year: int
+    month: int = Field(ge=1, le=12)
+    category_id: PydanticObjectId
+    total: DecimalAmount = Decimal("0")
+    expense_count: int = 0
+    updated_at: datetime = Field(default_factory=utc_now)
+
+    class Settings:
+        name = "monthly_rollups"
+        indexes = [
+            IndexModel(
+                [("user_id", 1), ("year", 1), ("month", 1), ("category_id", 1)],
+                unique=True,
+            ),
+        ]
+
+    class Config:
+        populate_by_name = True
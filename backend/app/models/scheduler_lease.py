@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from beanie import Document, Indexed
+from pydantic import Field
+
+from app.utils import utc_now
+
+
+class SchedulerLease(Document):
+    """Time-limited lock naming the worker that currently runs a set of scheduled jobs."""
+    name: Indexed(str, unique=True)
+    holder: str
+    expires_at: datetime
+    heartbeat_at: datetime = Field(default_factory=utc_now)
+    acquired_at: datetime = Field(default_factory=utc_now)
+
+    class Settings:
+        name = "scheduler_leases"
+
+    class Config:
+        populate_by_name = True
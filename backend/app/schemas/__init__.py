@@ -1,5 +1,12 @@
 from app.schemas.category import CategoryCreate, CategoryResponse
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
+from app.schemas.expense import (
+    ExpenseCreate,
+    ExpenseUpdate,
+    ExpenseResponse,
+    ExpenseBulkCreate,
+    ExpenseBulkItemResult,
+    ExpenseBulkCreateResponse,
+)
 from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetWithActualResponse
 
 __all__ = [
@@ -8,6 +15,9 @@ __all__ = [
     "ExpenseCreate",
     "ExpenseUpdate",
     "ExpenseResponse",
+    "ExpenseBulkCreate",
+    "ExpenseBulkItemResult",
+    "ExpenseBulkCreateResponse",
     "BudgetCreate",
     "BudgetUpdate",
     "BudgetResponse",
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from app.schemas.analytics import MonthlyTotalResponse, CategoryDistributionResponse
+from app.schemas.budget import BudgetWithActualResponse
+from app.schemas.daily_breakdown import DailyBreakdownResponse
+
+
+class DashboardResponse(BaseModel):
+    """Everything the dashboard shows for one month, computed from a single expense scan."""
+    month: int
+    year: int
+    currency: str = "PHP"
+    monthly_total: MonthlyTotalResponse
+    category_distribution: CategoryDistributionResponse
+    daily_breakdown: DailyBreakdownResponse
+    budgets: list[BudgetWithActualResponse]
@@ -1,6 +1,8 @@
 from datetime import date as date_type
 from decimal import Decimal
 
+from typing import Any
+
 from beanie import PydanticObjectId
 from pydantic import BaseModel, Field
 
@@ -45,3 +47,21 @@ class ExpenseResponse(BaseModel):
     updated_at: str
 
     model_config = {"from_attributes": True}
+
+
+class ExpenseBulkCreate(BaseModel):
+    """Items are validated one by one so a bad item does not reject the whole batch."""
+    items: list[dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+
+
+class ExpenseBulkItemResult(BaseModel):
+    index: int
+    success: bool
+    id: str | None = None
+    error: str | None = None
+
+
+class ExpenseBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[ExpenseBulkItemResult]
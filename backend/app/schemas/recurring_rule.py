@@ -21,6 +21,16 @@ class RecurringRuleUpdate(BaseModel):
     frequency: str | None = Field(None, pattern="^(daily|weekly|monthly|yearly)$")
 
 
+class ProjectedExpenseResponse(BaseModel):
+    """An expense a recurring rule will create (not stored)."""
+    rule_id: str
+    category_id: str
+    amount: Decimal
+    currency: str
+    note: str | None
+    date: date
+
+
 class RecurringRuleResponse(BaseModel):
     id: str
     user_id: str
@@ -17,24 +17,71 @@ from app.schemas.daily_breakdown import (
     DailyBreakdownResponse,
     DailyBreakdownItem,
 )
+from app.schemas.dashboard import DashboardResponse
+from app.config import settings
+from app.services.budget import budget_service
+from app.services.chat_context import chat_context_service
+from app.services.recurring_projection import ProjectedTotals, recurring_projection_service
+from app.services.rollup import rollup_service
+from app.utils import decimal_from_bson
+from app.utils.cache import UserCache
 
+# Results keyed by (user_id, query, params); dropped per user on expense writes
+analytics_cache = UserCache(
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
 
-async def get_monthly_total(
-    user_id: PydanticObjectId,
-    month: int,
-    year: int,
-    currency: str = "PHP",
-) -> MonthlyTotalResponse:
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+    """First and last day of the given month."""
     start = date(year, month, 1)
     end = start.replace(day=28) + timedelta(days=4)
     end = end.replace(day=1) - timedelta(days=1)  # last day of month
-    expenses = await Expense.find(
+    return start, end
+
+
+def _projected_by_category(projected: ProjectedTotals) -> dict[PydanticObjectId, Decimal]:
+    out: dict[PydanticObjectId, Decimal] = {}
+    for by_category in projected.values():
+        for cid, (amount, _) in by_category.items():
+            out[cid] = out.get(cid, Decimal("0")) + amount
+    return out
+
+
+def _merge_totals(
+    totals: dict[PydanticObjectId, Decimal],
+    extra: dict[PydanticObjectId, Decimal],
+) -> dict[PydanticObjectId, Decimal]:
+    merged = dict(totals)
+    for cid, amount in extra.items():
+        merged[cid] = merged.get(cid, Decimal("0")) + amount
+    return merged
+
+
+def _month_expenses(user_id: PydanticObjectId, start: date, end: date):
+    """Find query for a user's expenses in [start, end]; served by the (user_id, date) index."""
+    return Expense.find(
         Expense.user_id == user_id,
         Expense.date >= start,
         Expense.date <= end,
-    ).to_list()
-    total = sum(e.amount for e in expenses)
-    return MonthlyTotalResponse(month=month, year=year, total=Decimal(str(total)), currency=currency)
+    )
+
+
+async def get_monthly_total(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+    currency: str = "PHP",
+    include_projected: bool = False,
+) -> MonthlyTotalResponse:
+    # Read the per-category rollups (O(categories)) instead of scanning expenses
+    rollups = await rollup_service.month(user_id, year, month)
+    total = sum((r.total for r in rollups), Decimal("0"))
+    if include_projected:
+        projected = await recurring_projection_service.totals(user_id, *_month_bounds(year, month))
+        total += sum(_projected_by_category(projected).values(), Decimal("0"))
+    return MonthlyTotalResponse(month=month, year=year, total=total, currency=currency)
 
 
 async def get_category_distribution(
@@ -42,24 +89,17 @@ async def get_category_distribution(
     month: int,
     year: int,
     currency: str = "PHP",
+    include_projected: bool = False,
 ) -> CategoryDistributionResponse:
-    start = date(year, month, 1)
-    end = start.replace(day=28) + timedelta(days=4)
-    end = end.replace(day=1) - timedelta(days=1)
-    expenses = await Expense.find(
-        Expense.user_id == user_id,
-        Expense.date >= start,
-        Expense.date <= end,
-    ).to_list()
-    total = sum(e.amount for e in expenses)
-    # Group by category_id
-    by_cat: dict[str, Decimal] = {}
-    for e in expenses:
-        cid = str(e.category_id)
-        by_cat[cid] = by_cat.get(cid, Decimal("0")) + e.amount
+    rollups = await rollup_service.month(user_id, year, month)
+    totals = {r.category_id: r.total for r in rollups}
+    if include_projected:
+        projected = await recurring_projection_service.totals(user_id, *_month_bounds(year, month))
+        totals = _merge_totals(totals, _projected_by_category(projected))
+    by_cat = sorted(((str(cid), amt) for cid, amt in totals.items()), key=lambda x: -x[1])
+    total = sum((amt for _, amt in by_cat), Decimal("0"))
     # Resolve category names
-    category_ids = list(by_cat.keys())
-    oids = [PydanticObjectId(cid) for cid in category_ids]
+    oids = [PydanticObjectId(cid) for cid, _ in by_cat]
     categories = await Category.find(In(Category.id, oids)).to_list()
     name_by_id = {str(c.id): c.name for c in categories}
     by_category = [
@@ -69,12 +109,12 @@ async def get_category_distribution(
             total=amt,
             currency=currency,
         )
-        for cid, amt in sorted(by_cat.items(), key=lambda x: -x[1])
+        for cid, amt in by_cat
     ]
     return CategoryDistributionResponse(
         month=month,
         year=year,
-        total=Decimal(str(total)),
+        total=total,
         currency=currency,
         by_category=by_category,
     )
@@ -84,10 +124,11 @@ async def get_spending_trend(
     user_id: PydanticObjectId,
     months_back: int = 12,
     currency: str = "PHP",
+    include_projected: bool = False,
 ) -> SpendingTrendResponse:
     """Return monthly totals for the last N months (newest first)."""
     today = date.today()
-    points: list[TrendPoint] = []
+    months: list[tuple[int, int]] = []
     for i in range(months_back):
         # month/year going back
         m = today.month - 1 - i
@@ -95,69 +136,197 @@ async def get_spending_trend(
         while m <= 0:
             m += 12
             y -= 1
-        start = date(y, m, 1)
-        end = start.replace(day=28) + timedelta(days=4)
-        end = end.replace(day=1) - timedelta(days=1)
-        expenses = await Expense.find(
-            Expense.user_id == user_id,
-            Expense.date >= start,
-            Expense.date <= end,
-        ).to_list()
-        total = sum(e.amount for e in expenses)
-        points.append(TrendPoint(month=m, year=y, total=Decimal(str(total)), currency=currency))
+        months.append((y, m))
+    oldest_y, oldest_m = months[-1]
+    start, _ = _month_bounds(oldest_y, oldest_m)
+    _, end = _month_bounds(today.year, today.month)
+    # One grouped query over the whole window instead of one query per month
+    rows = await _month_expenses(user_id, start, end).aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"year": {"$year": "$date"}, "month": {"$month": "$date"}},
+                    "total": {"$sum": "$amount"},
+                }
+            }
+        ]
+    ).to_list()
+    by_month = {
+        (r["_id"]["year"], r["_id"]["month"]): decimal_from_bson(r["total"]) for r in rows
+    }
+    if include_projected:
+        projected = await recurring_projection_service.totals(user_id, start, end)
+        for day, by_category in projected.items():
+            amount = sum((a for a, _ in by_category.values()), Decimal("0"))
+            by_month[(day.year, day.month)] = by_month.get((day.year, day.month), Decimal("0")) + amount
+    points = [
+        TrendPoint(month=m, year=y, total=by_month.get((y, m), Decimal("0")), currency=currency)
+        for y, m in months
+    ]
     return SpendingTrendResponse(points=points, currency=currency)
 
 
+def _merge_projected_days(
+    by_day: dict[int, tuple[Decimal, int]],
+    projected: ProjectedTotals,
+) -> dict[int, tuple[Decimal, int]]:
+    merged = dict(by_day)
+    for day, by_category in projected.items():
+        total, count = merged.get(day.day, (Decimal("0"), 0))
+        for amount, n in by_category.values():
+            total, count = total + amount, count + n
+        merged[day.day] = (total, count)
+    return merged
+
+
+def _daily_items(by_day: dict[int, tuple[Decimal, int]], currency: str) -> list[DailyBreakdownItem]:
+    return [
+        DailyBreakdownItem(day=day, total=total, currency=currency, transaction_count=count)
+        for day, (total, count) in sorted(by_day.items())
+    ]
+
+
 async def get_daily_breakdown(
     user_id: PydanticObjectId,
     month: int,
     year: int,
     currency: str = "PHP",
+    include_projected: bool = False,
 ) -> DailyBreakdownResponse:
     """Return daily spending totals for a given month (calendar view)."""
-    start = date(year, month, 1)
-    end = start.replace(day=28) + timedelta(days=4)
-    end = end.replace(day=1) - timedelta(days=1)  # last day of month
-    
-    expenses = await Expense.find(
-        Expense.user_id == user_id,
-        Expense.date >= start,
-        Expense.date <= end,
+    start, end = _month_bounds(year, month)
+    rows = await _month_expenses(user_id, start, end).aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"$dayOfMonth": "$date"},
+                    "total": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
     ).to_list()
-    
-    # Group by day
-    by_day: dict[int, tuple[Decimal, int]] = {}  # day -> (total, count)
-    for e in expenses:
-        day = e.date.day
-        total, count = by_day.get(day, (Decimal("0"), 0))
-        by_day[day] = (total + e.amount, count + 1)
-    
-    # Create response items for all days with spending
-    daily_items = [
-        DailyBreakdownItem(
-            day=day,
-            total=total,
+
+    by_day = {r["_id"]: (decimal_from_bson(r["total"]), r["count"]) for r in rows}
+    if include_projected:
+        by_day = _merge_projected_days(by_day, await recurring_projection_service.totals(user_id, start, end))
+
+    # Only days with spending are returned
+    daily_items = _daily_items(by_day, currency)
+
+    total = sum((item.total for item in daily_items), Decimal("0"))
+    return DailyBreakdownResponse(
+        month=month,
+        year=year,
+        total=total,
+        currency=currency,
+        by_day=daily_items,
+    )
+
+
+async def get_dashboard(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+    currency: str = "PHP",
+    include_projected: bool = False,
+) -> DashboardResponse:
+    """
+    Monthly total, category distribution, daily breakdown and budgets for one month.
+    A single $facet pass over the month's expenses feeds every section.
+    """
+    start, end = _month_bounds(year, month)
+    rows = await _month_expenses(user_id, start, end).aggregate(
+        [
+            {
+                "$facet": {
+                    "by_category": [
+                        {"$group": {"_id": "$category_id", "total": {"$sum": "$amount"}}},
+                        {"$sort": {"total": -1}},
+                    ],
+                    "by_day": [
+                        {
+                            "$group": {
+                                "_id": {"$dayOfMonth": "$date"},
+                                "total": {"$sum": "$amount"},
+                                "count": {"$sum": 1},
+                            }
+                        },
+                        {"$sort": {"_id": 1}},
+                    ],
+                }
+            }
+        ]
+    ).to_list()
+    facets = rows[0] if rows else {"by_category": [], "by_day": []}
+    totals_by_category = {
+        PydanticObjectId(r["_id"]): decimal_from_bson(r["total"]) for r in facets["by_category"]
+    }
+    by_day_totals = {r["_id"]: (decimal_from_bson(r["total"]), r["count"]) for r in facets["by_day"]}
+    if include_projected:
+        projected = await recurring_projection_service.totals(user_id, start, end)
+        totals_by_category = dict(
+            sorted(
+                _merge_totals(totals_by_category, _projected_by_category(projected)).items(),
+                key=lambda kv: -kv[1],
+            )
+        )
+        by_day_totals = _merge_projected_days(by_day_totals, projected)
+    total = sum(totals_by_category.values(), Decimal("0"))
+
+    categories = await Category.find(In(Category.id, list(totals_by_category))).to_list()
+    name_by_id = {c.id: c.name for c in categories}
+    by_category = [
+        CategoryBreakdownItem(
+            category_id=str(cid),
+            category_name=name_by_id.get(cid, "Unknown"),
+            total=amt,
             currency=currency,
-            transaction_count=count,
         )
-        for day, (total, count) in sorted(by_day.items())
+        for cid, amt in totals_by_category.items()
     ]
-    
-    total = sum(e.amount for e in expenses)
-    return DailyBreakdownResponse(
+    by_day = _daily_items(by_day_totals, currency)
+    budgets = await budget_service.list_for_month_totals(user_id, month, year, totals_by_category)
+    return DashboardResponse(
         month=month,
         year=year,
-        total=Decimal(str(total)),
         currency=currency,
-        by_day=daily_items,
+        monthly_total=MonthlyTotalResponse(month=month, year=year, total=total, currency=currency),
+        category_distribution=CategoryDistributionResponse(
+            month=month,
+            year=year,
+            total=total,
+            currency=currency,
+            by_category=by_category,
+        ),
+        daily_breakdown=DailyBreakdownResponse(
+            month=month,
+            year=year,
+            total=total,
+            currency=currency,
+            by_day=by_day,
+        ),
+        budgets=budgets,
     )
 
 
+def invalidate_user_analytics(user_id: PydanticObjectId) -> None:
+    """Drop cached analytics for a user; call after any write to their expenses."""
+    analytics_cache.invalidate_user(user_id)
+    chat_context_service.invalidate_user(user_id)
+
+
 class AnalyticsService:
-    monthly_total = staticmethod(get_monthly_total)
-    category_distribution = staticmethod(get_category_distribution)
-    spending_trend = staticmethod(get_spending_trend)
-    daily_breakdown = staticmethod(get_daily_breakdown)
+    monthly_total = staticmethod(analytics_cache.cached("monthly_total")(get_monthly_total))
+    category_distribution = staticmethod(
+        analytics_cache.cached("category_distribution")(get_category_distribution)
+    )
+    spending_trend = staticmethod(analytics_cache.cached("spending_trend")(get_spending_trend))
+    daily_breakdown = staticmethod(analytics_cache.cached("daily_breakdown")(get_daily_breakdown))
+    dashboard = staticmethod(get_dashboard)
+    invalidate_user = staticmethod(invalidate_user_analytics)
+    cache_stats = staticmethod(analytics_cache.stats)
 
 
 analytics_service = AnalyticsService()
@@ -0,0 +1,143 @@
+"""
+Stored behavior analyses for closed months.
+
+The nightly job precomputes last month's analysis for every active user; the
+endpoint serves a stored result when it is still current and computes (and
+stores) it on a miss. A snapshot is stale once any of the user's rollups in the
+analysis window (the month, its trend months and the spike baseline) was updated
+after it was computed, i.e. an expense there was edited. Results whose insights
+fell back to placeholder text (LLM error or rate limit) are never stored.
+"""
+import asyncio
+from datetime import date, datetime
+
+from beanie import PydanticObjectId
+from beanie.odm.operators.find.logical import And, Or
+
+from app.config import settings
+from app.models.behavior_snapshot import BehaviorAnalysisSnapshot
+from app.models.expense import Expense
+from app.models.monthly_rollup import MonthlyRollup
+from app.schemas.analysis_behavior import BehaviorAnalysisResponse
+from app.services.llm_analysis import analysis_window, analyze_behavior, generate_behavior_analysis
+from app.utils import utc_now
+
+
+def _is_closed(month: int, year: int) -> bool:
+    today = date.today()
+    return (year, month) < (today.year, today.month)
+
+
+def previous_month(today: date | None = None) -> tuple[int, int]:
+    """(month, year) of the month before today."""
+    today = today or date.today()
+    if today.month == 1:
+        return 12, today.year - 1
+    return today.month - 1, today.year
+
+
+def _window_months(month: int, year: int) -> list[tuple[int, int]]:
+    """(year, month) of every month the analysis of month/year reads expenses from."""
+    start, end = analysis_window(month, year)
+    months = []
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+async def _load_current(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+) -> BehaviorAnalysisSnapshot | None:
+    snapshot = await BehaviorAnalysisSnapshot.find_one(
+        BehaviorAnalysisSnapshot.user_id == user_id,
+        BehaviorAnalysisSnapshot.year == year,
+        BehaviorAnalysisSnapshot.month == month,
+    )
+    if snapshot is None:
+        return None
+    changed = await MonthlyRollup.find_one(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.updated_at > snapshot.created_at,
+        Or(*[And(MonthlyRollup.year == y, MonthlyRollup.month == m) for y, m in _window_months(month, year)]),
+    )
+    return None if changed else snapshot
+
+
+async def _store(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+    result: BehaviorAnalysisResponse,
+) -> None:
+    await BehaviorAnalysisSnapshot.get_motor_collection().replace_one(
+        {"user_id": user_id, "year": year, "month": month},
+        {
+            "user_id": user_id,
+            "year": year,
+            "month": month,
+            "result": result.model_dump(mode="json"),
+            "created_at": utc_now(),
+        },
+        upsert=True,
+    )
+
+
+async def get_behavior_analysis(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+) -> BehaviorAnalysisResponse:
+    """Serve a stored analysis for closed months; compute on a miss (or for the open month)."""
+    if not _is_closed(month, year):
+        return await generate_behavior_analysis(user_id, month, year)
+    snapshot = await _load_current(user_id, month, year)
+    if snapshot is not None:
+        return BehaviorAnalysisResponse.model_validate(snapshot.result)
+    result, generated = await analyze_behavior(user_id, month, year)
+    if generated:
+        await _store(user_id, month, year, result)
+    return result
+
+
+async def precompute_behavior_analyses(month: int, year: int) -> int:
+    """
+    Compute and store the analysis for every user with expenses in the month,
+    BEHAVIOR_PRECOMPUTE_CONCURRENCY users at a time. Returns number of analyses stored.
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    # Expense dates are stored as midnight datetimes
+    user_ids = await Expense.distinct("user_id", {"date": {"$gte": start, "$lt": end}})
+    semaphore = asyncio.Semaphore(settings.BEHAVIOR_PRECOMPUTE_CONCURRENCY)
+    stored = 0
+
+    async def run_one(user_id: PydanticObjectId) -> None:
+        nonlocal stored
+        async with semaphore:
+            try:
+                if await _load_current(user_id, month, year) is not None:
+                    return
+                result, generated = await analyze_behavior(user_id, month, year)
+                if not generated:
+                    # Leave it unstored so the next request or run retries the LLM
+                    print(f"Behavior precompute for user {user_id}: no LLM insights, not stored")
+                    return
+                await _store(user_id, month, year, result)
+                stored += 1
+            except Exception as e:
+                print(f"Behavior precompute failed for user {user_id}: {e}")
+
+    await asyncio.gather(*(run_one(PydanticObjectId(u)) for u in user_ids))
+    return stored
+
+
+class BehaviorSnapshotService:
+    get = staticmethod(get_behavior_analysis)
+    precompute = staticmethod(precompute_behavior_analyses)
+
+
+behavior_snapshot_service = BehaviorSnapshotService()
@@ -1,12 +1,12 @@
-from datetime import date
 from decimal import Decimal
 
 from beanie import PydanticObjectId
 from fastapi import HTTPException, status
 
 from app.models.budget import Budget
-from app.models.expense import Expense
 from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse, BudgetWithActualResponse
+from app.services.chat_context import chat_context_service
+from app.services.rollup import rollup_service
 
 
 def _budget_to_response(b: Budget) -> BudgetResponse:
@@ -29,30 +29,9 @@ async def _actual_spent(
     year: int,
     category_id: PydanticObjectId | None,
 ) -> Decimal:
-    """Sum of expenses for the user in the given month (and category if set)."""
-    start = date(year, month, 1)
-    if month == 12:
-        end = date(year, 12, 31)
-    else:
-        end = date(year, month + 1, 1)
-    from datetime import timedelta
-    end = end - timedelta(days=1)
-
-    if category_id is not None:
-        expenses = await Expense.find(
-            Expense.user_id == user_id,
-            Expense.date >= start,
-            Expense.date <= end,
-            Expense.category_id == category_id,
-        ).to_list()
-    else:
-        expenses = await Expense.find(
-            Expense.user_id == user_id,
-            Expense.date >= start,
-            Expense.date <= end,
-        ).to_list()
-    total = sum(e.amount for e in expenses)
-    return Decimal(str(total))
+    """Sum of expenses for the user in the given month (and category if set), from the monthly rollups."""
+    totals = await rollup_service.category_totals_for_months(user_id, [(year, month)])
+    return actual_from_category_totals(category_id, totals[(year, month)])
 
 
 async def create_budget(
@@ -80,6 +59,7 @@ async def create_budget(
         category_id=cat_oid,
     )
     await budget.insert()
+    chat_context_service.invalidate_user(user_id)
     return _budget_to_response(budget)
 
 
@@ -100,13 +80,27 @@ async def get_budget_with_actual(
 ) -> BudgetWithActualResponse:
     budget = await get_budget(budget_id, user_id)
     actual = await _actual_spent(user_id, budget.month, budget.year, budget.category_id)
+    return _with_actual(budget, actual)
+
+
+def _with_actual(b: Budget, actual: Decimal) -> BudgetWithActualResponse:
     return BudgetWithActualResponse(
-        **_budget_to_response(budget).model_dump(),
+        **_budget_to_response(b).model_dump(),
         actual_spent=actual,
-        exceeded=actual >= budget.amount,
+        exceeded=actual >= b.amount,
     )
 
 
+def actual_from_category_totals(
+    category_id: PydanticObjectId | None,
+    totals: dict[PydanticObjectId, Decimal],
+) -> Decimal:
+    """Actual spend for a budget given one month's per-category totals (None = all categories)."""
+    if category_id is None:
+        return sum(totals.values(), Decimal("0"))
+    return totals.get(category_id, Decimal("0"))
+
+
 async def list_budgets(
     user_id: PydanticObjectId,
     month: int | None = None,
@@ -119,22 +113,38 @@ async def list_budgets(
     if year is not None:
         conditions.append(Budget.year == year)
     budgets = await Budget.find(*conditions).to_list()
-    out = []
-    for b in budgets:
-        if include_actual:
-            actual = await _actual_spent(user_id, b.month, b.year, b.category_id)
-            exceeded = actual >= b.amount
-        else:
-            actual = Decimal("0")
-            exceeded = False
-        out.append(
+    if not include_actual:
+        return [
             BudgetWithActualResponse(
                 **_budget_to_response(b).model_dump(),
-                actual_spent=actual,
-                exceeded=exceeded,
+                actual_spent=Decimal("0"),
+                exceeded=False,
             )
-        )
-    return out
+            for b in budgets
+        ]
+    # One grouped read for every (year, month) covered, joined to budgets in memory
+    totals = await rollup_service.category_totals_for_months(
+        user_id, {(b.year, b.month) for b in budgets}
+    )
+    return [
+        _with_actual(b, actual_from_category_totals(b.category_id, totals[(b.year, b.month)]))
+        for b in budgets
+    ]
+
+
+async def list_budgets_for_month_totals(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+    totals: dict[PydanticObjectId, Decimal],
+) -> list[BudgetWithActualResponse]:
+    """Budgets for one month with actuals taken from already-computed per-category totals."""
+    budgets = await Budget.find(
+        Budget.user_id == user_id,
+        Budget.month == month,
+        Budget.year == year,
+    ).to_list()
+    return [_with_actual(b, actual_from_category_totals(b.category_id, totals)) for b in budgets]
 
 
 async def update_budget(
@@ -151,12 +161,14 @@ async def update_budget(
     for k, v in data.items():
         setattr(budget, k, v)
     await budget.save()
+    chat_context_service.invalidate_user(user_id)
     return _budget_to_response(budget)
 
 
 async def delete_budget(budget_id: str, user_id: PydanticObjectId) -> None:
     budget = await get_budget(budget_id, user_id)
     await budget.delete()
+    chat_context_service.invalidate_user(user_id)
 
 
 class BudgetService:
@@ -164,6 +176,7 @@ class BudgetService:
     get_one = staticmethod(get_budget)
     get_one_with_actual = staticmethod(get_budget_with_actual)
     list_for_user = staticmethod(list_budgets)
+    list_for_month_totals = staticmethod(list_budgets_for_month_totals)
     update = staticmethod(update_budget)
     delete = staticmethod(delete_budget)
 
@@ -1,7 +1,9 @@
 import re
+from collections import OrderedDict
 from typing import Sequence
 
 from beanie import PydanticObjectId
+from beanie.odm.operators.find.comparison import In
 from beanie.odm.operators.find.logical import Or
 
 from app.models.category import Category
@@ -32,6 +34,33 @@ async def list_categories_for_user(user_id: PydanticObjectId) -> list[CategoryRe
     ]
 
 
+# Category names never change once created, so id -> name is cached for the process
+_CATEGORY_NAME_CACHE_MAX = 10_000
+_category_names: OrderedDict[PydanticObjectId, str] = OrderedDict()  # least recently used first
+
+
+async def get_category_names(ids: Sequence[PydanticObjectId]) -> dict[PydanticObjectId, str]:
+    """
+    Resolve category ids to names, querying only ids not already cached (LRU-bounded).
+    Unknown ids map to "Unknown".
+    """
+    names: dict[PydanticObjectId, str] = {}
+    missing: list[PydanticObjectId] = []
+    for i in set(ids):
+        if i in _category_names:
+            _category_names.move_to_end(i)
+            names[i] = _category_names[i]
+        else:
+            missing.append(i)
+    if missing:
+        found = await Category.find(In(Category.id, missing)).to_list()
+        for c in found:
+            names[c.id] = _category_names[c.id] = c.name
+        while len(_category_names) > _CATEGORY_NAME_CACHE_MAX:
+            _category_names.popitem(last=False)
+    return {i: names.get(i, "Unknown") for i in ids}
+
+
 async def create_user_category(
     user_id: PydanticObjectId,
     payload: CategoryCreate,
@@ -84,6 +113,7 @@ async def seed_system_categories() -> int:
 class CategoryService:
     list_for_user = staticmethod(list_categories_for_user)
     create_user_category = staticmethod(create_user_category)
+    names = staticmethod(get_category_names)
     seed_system = staticmethod(seed_system_categories)
 
 
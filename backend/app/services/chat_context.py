@@ -0,0 +1,102 @@
+"""
+Compact spending context for the financial advice chat.
+
+One month's totals, daily average, top categories and budget status, rendered as a
+few prompt lines and trimmed to a token budget. Results are cached per user and
+month; expense writes (via analytics invalidation) and budget writes drop them.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from beanie import PydanticObjectId
+
+from app.config import settings
+from app.models.budget import Budget
+from app.services.category import category_service
+from app.services.rollup import rollup_service
+from app.utils.cache import UserCache
+
+chat_context_cache = UserCache(
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
+
+
+def _days_elapsed(year: int, month: int, today: date) -> int:
+    """Days of the month that have passed (the whole month once it is over)."""
+    if (year, month) == (today.year, today.month):
+        return today.day
+    return calendar.monthrange(year, month)[1]
+
+
+def _percent(part: Decimal, whole: Decimal) -> str:
+    return f"{part / whole * 100:.0f}%" if whole else "n/a"
+
+
+async def build_spending_context(
+    user_id: PydanticObjectId,
+    year: int,
+    month: int,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Spending summary for one month as prompt text, most important lines first.
+    Lines are dropped from the end to stay within max_tokens (~4 characters per token).
+    """
+    max_chars = (max_tokens or settings.CHAT_CONTEXT_MAX_TOKENS) * 4
+    rollups = await rollup_service.month(user_id, year, month)
+    totals = {r.category_id: r.total for r in rollups}
+    total = sum(totals.values(), Decimal("0"))
+    count = sum(r.expense_count for r in rollups)
+    days = _days_elapsed(year, month, date.today())
+
+    lines = [
+        f"User's spending for {month}/{year}:",
+        f"- Total spending: ₱{total:.2f} across {count} expenses",
+        f"- Average daily spending: ₱{total / days:.2f} over {days} days",
+    ]
+
+    budgets = await Budget.find(
+        Budget.user_id == user_id,
+        Budget.month == month,
+        Budget.year == year,
+    ).to_list()
+    top = sorted(totals.items(), key=lambda kv: -kv[1])[: settings.CHAT_CONTEXT_TOP_CATEGORIES]
+    names = await category_service.names(
+        [cid for cid, _ in top] + [b.category_id for b in budgets if b.category_id]
+    )
+
+    for b in sorted(budgets, key=lambda b: b.category_id is not None):
+        spent = totals.get(b.category_id, Decimal("0")) if b.category_id else total
+        label = names.get(b.category_id, "Unknown") if b.category_id else "Overall"
+        state = "over budget" if spent >= b.amount else f"₱{b.amount - spent:.2f} left"
+        lines.append(
+            f"- {label} budget: ₱{spent:.2f} of ₱{b.amount:.2f} ({_percent(spent, b.amount)}, {state})"
+        )
+    if top:
+        lines.append("- Top categories:")
+        lines += [
+            f"  - {names.get(cid, 'Unknown')}: ₱{amt:.2f} ({_percent(amt, total)})"
+            for cid, amt in top
+        ]
+
+    text = ""
+    for line in lines:
+        if len(text) + len(line) + 1 > max_chars:
+            break
+        text += line + "\n"
+    return text
+
+
+def invalidate_user_chat_context(user_id: PydanticObjectId) -> None:
+    chat_context_cache.invalidate_user(user_id)
+
+
+class ChatContextService:
+    spending_context = staticmethod(chat_context_cache.cached("spending_context")(build_spending_context))
+    invalidate_user = staticmethod(invalidate_user_chat_context)
+    cache_stats = staticmethod(chat_context_cache.stats)
+
+
+chat_context_service = ChatContextService()
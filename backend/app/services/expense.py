@@ -1,12 +1,32 @@
+import base64
 from datetime import date
 from decimal import Decimal
 from typing import Sequence
 
 from beanie import PydanticObjectId
+from beanie.exceptions import RevisionIdWasChanged
+from beanie.odm.operators.find.logical import And, Or
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.models.expense import Expense
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
+from app.schemas.expense import (
+    ExpenseCreate,
+    ExpenseUpdate,
+    ExpenseResponse,
+    ExpenseBulkItemResult,
+    ExpenseBulkCreateResponse,
+)
+from app.services.analytics import analytics_service
+from app.services.rollup import rollup_service
+
+
+def _duplicate_recurring_expense() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="An expense for this recurring rule already exists on this date",
+    )
 
 
 def _expense_to_response(e: Expense) -> ExpenseResponse:
@@ -25,6 +45,21 @@ def _expense_to_response(e: Expense) -> ExpenseResponse:
     )
 
 
+def encode_cursor(expense_date: date, expense_id: str) -> str:
+    """Opaque keyset cursor for the (date, _id) position of an expense."""
+    raw = f"{expense_date.isoformat()}|{expense_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[date, PydanticObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.split("|")
+        return date.fromisoformat(date_part), PydanticObjectId(id_part)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 async def create_expense(
     user_id: PydanticObjectId,
     payload: ExpenseCreate,
@@ -39,10 +74,85 @@ async def create_expense(
         is_recurring=payload.is_recurring,
         recurring_rule_id=payload.recurring_rule_oid(),
     )
-    await expense.insert()
+    try:
+        await expense.insert()
+    except DuplicateKeyError:
+        raise _duplicate_recurring_expense()
+    await rollup_service.apply_change(None, expense)
+    analytics_service.invalidate_user(user_id)
     return _expense_to_response(expense)
 
 
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def _validation_message(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc']) or 'item'}: {e['msg']}" for e in err.errors()
+    )
+
+
+async def create_expenses_bulk(
+    user_id: PydanticObjectId,
+    items: list[dict],
+) -> ExpenseBulkCreateResponse:
+    """
+    Validate every item, then write the valid ones with unordered insert_many in chunks.
+    Reports success or failure per input index.
+    """
+    results: list[ExpenseBulkItemResult] = []
+    pending: list[tuple[int, Expense]] = []
+    for index, item in enumerate(items):
+        try:
+            payload = ExpenseCreate.model_validate(item)
+            expense = Expense(
+                id=PydanticObjectId(),
+                user_id=user_id,
+                category_id=payload.category_oid(),
+                amount=payload.amount,
+                currency=payload.currency.upper(),
+                date=payload.date,
+                note=payload.note,
+                is_recurring=payload.is_recurring,
+                recurring_rule_id=payload.recurring_rule_oid(),
+            )
+        except ValidationError as e:
+            results.append(ExpenseBulkItemResult(index=index, success=False, error=_validation_message(e)))
+            continue
+        except Exception as e:  # e.g. malformed ObjectId strings
+            results.append(ExpenseBulkItemResult(index=index, success=False, error=str(e)))
+            continue
+        pending.append((index, expense))
+
+    inserted: list[Expense] = []
+    for offset in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+        chunk = pending[offset:offset + BULK_INSERT_CHUNK_SIZE]
+        errors: dict[int, str] = {}
+        try:
+            await Expense.insert_many([e for _, e in chunk], ordered=False)
+        except BulkWriteError as bwe:
+            errors = {
+                err["index"]: err.get("errmsg", "write failed")
+                for err in bwe.details.get("writeErrors", [])
+            }
+        for pos, (index, expense) in enumerate(chunk):
+            if pos in errors:
+                results.append(ExpenseBulkItemResult(index=index, success=False, error=errors[pos]))
+            else:
+                inserted.append(expense)
+                results.append(ExpenseBulkItemResult(index=index, success=True, id=str(expense.id)))
+
+    if inserted:
+        await rollup_service.record(inserted)
+        analytics_service.invalidate_user(user_id)
+    results.sort(key=lambda r: r.index)
+    return ExpenseBulkCreateResponse(
+        created=len(inserted),
+        failed=len(results) - len(inserted),
+        results=results,
+    )
+
+
 async def get_expense(
     expense_id: str,
     user_id: PydanticObjectId,
@@ -61,7 +171,13 @@ async def list_expenses(
     category_id: str | None = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[ExpenseResponse]:
+    """
+    Expenses newest first, ordered by (date, _id).
+    With a cursor (from encode_cursor) the page starts right after that position and
+    skip is ignored, so every page costs the same; otherwise skip/limit offsets are used.
+    """
     query = Expense.find(Expense.user_id == user_id)
     if month is not None and year is not None:
         from datetime import date as date_type
@@ -77,7 +193,16 @@ async def list_expenses(
         query = query.find(Expense.date >= start, Expense.date <= end)
     if category_id is not None:
         query = query.find(Expense.category_id == PydanticObjectId(category_id))
-    expenses = await query.sort(-Expense.date).skip(skip).limit(limit).to_list()
+    if cursor is not None:
+        after_date, after_id = _decode_cursor(cursor)
+        query = query.find(
+            Or(
+                Expense.date < after_date,
+                And(Expense.date == after_date, Expense.id < after_id),
+            )
+        )
+        skip = 0
+    expenses = await query.sort(-Expense.date, -Expense.id).skip(skip).limit(limit).to_list()
     return [_expense_to_response(e) for e in expenses]
 
 
@@ -87,6 +212,7 @@ async def update_expense(
     payload: ExpenseUpdate,
 ) -> ExpenseResponse:
     expense = await get_expense(expense_id, user_id)
+    before = expense.model_copy()
     data = payload.model_dump(exclude_unset=True)
     if "category_id" in data and data["category_id"] is not None:
         data["category_id"] = PydanticObjectId(data["category_id"])
@@ -96,17 +222,26 @@ async def update_expense(
         data["currency"] = data["currency"].upper()
     for k, v in data.items():
         setattr(expense, k, v)
-    await expense.save()
+    try:
+        await expense.save()
+    except RevisionIdWasChanged:
+        # Beanie reports a DuplicateKeyError on save this way (expenses keep no revision id)
+        raise _duplicate_recurring_expense()
+    await rollup_service.apply_change(before, expense)
+    analytics_service.invalidate_user(user_id)
     return _expense_to_response(expense)
 
 
 async def delete_expense(expense_id: str, user_id: PydanticObjectId) -> None:
     expense = await get_expense(expense_id, user_id)
     await expense.delete()
+    await rollup_service.apply_change(expense, None)
+    analytics_service.invalidate_user(user_id)
 
 
 class ExpenseService:
     create = staticmethod(create_expense)
+    create_bulk = staticmethod(create_expenses_bulk)
     get_one = staticmethod(get_expense)
     list_for_user = staticmethod(list_expenses)
     update = staticmethod(update_expense)
@@ -2,6 +2,7 @@ import csv
 import io
 from datetime import date, timedelta
 from decimal import Decimal
+from typing import AsyncIterator
 
 from beanie import PydanticObjectId
 from reportlab.lib import colors
@@ -10,50 +11,80 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
+from app.config import settings
 from app.models.expense import Expense
 from app.models.category import Category
 from app.services.analytics import get_monthly_total, get_category_distribution
+from app.services.category import category_service
+from app.utils.worker_pool import BoundedExecutor
+
+# ReportLab rendering is CPU-bound; keep it off the event loop
+pdf_render_pool = BoundedExecutor(
+    max_workers=settings.PDF_RENDER_WORKERS,
+    use_processes=settings.PDF_RENDER_USE_PROCESSES,
+)
+
+
+CSV_BATCH_SIZE = 500
+
+
+def _csv_chunk(rows: list[list[str]]) -> str:
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    return out.getvalue()
+
+
+async def _csv_batch(expenses: list[Expense]) -> str:
+    names = await category_service.names([e.category_id for e in expenses])
+    return _csv_chunk([
+        [
+            e.date.isoformat(),
+            str(e.amount),
+            e.currency,
+            names[e.category_id],
+            (e.note or ""),
+            "Yes" if e.is_recurring else "No",
+        ]
+        for e in expenses
+    ])
 
 
 async def export_expenses_csv(
     user_id: PydanticObjectId,
     month: int | None = None,
     year: int | None = None,
-) -> str:
-    """Export user's expenses as CSV. If month/year given, filter to that month."""
+) -> AsyncIterator[str]:
+    """
+    Stream user's expenses as CSV text chunks. If month/year given, filter to that month.
+    Rows are read from the cursor CSV_BATCH_SIZE at a time, so memory stays flat for any history size.
+    """
+    conditions: list = [Expense.user_id == user_id]
     if month is not None and year is not None:
         start = date(year, month, 1)
         end = start.replace(day=28) + timedelta(days=4)
         end = end.replace(day=1) - timedelta(days=1)
-        expenses = await Expense.find(
-            Expense.user_id == user_id,
-            Expense.date >= start,
-            Expense.date <= end,
-        ).sort(-Expense.date).to_list()
-    else:
-        expenses = await Expense.find(Expense.user_id == user_id).sort(-Expense.date).limit(10_000).to_list()
+        conditions += [Expense.date >= start, Expense.date <= end]
+    query = Expense.find(*conditions, batch_size=CSV_BATCH_SIZE).sort(-Expense.date)
 
-    out = io.StringIO()
-    writer = csv.writer(out)
-    writer.writerow(["Date", "Amount", "Currency", "Category ID", "Note", "Recurring"])
-    for e in expenses:
-        writer.writerow([
-            e.date.isoformat(),
-            str(e.amount),
-            e.currency,
-            str(e.category_id),
-            (e.note or ""),
-            "Yes" if e.is_recurring else "No",
-        ])
-    return out.getvalue()
+    yield _csv_chunk([["Date", "Amount", "Currency", "Category", "Note", "Recurring"]])
+    batch: list[Expense] = []
+    async for e in query:
+        batch.append(e)
+        if len(batch) >= CSV_BATCH_SIZE:
+            yield await _csv_batch(batch)
+            batch = []
+    if batch:
+        yield await _csv_batch(batch)
 
 
-async def export_summary_pdf(
-    user_id: PydanticObjectId,
+def _render_summary_pdf(
     month: int,
     year: int,
+    currency: str,
+    total: str,
+    category_rows: list[tuple[str, str]],
 ) -> bytes:
-    """Generate a one-page PDF summary for the given month: total and by-category breakdown."""
+    """Build the summary PDF with ReportLab. CPU-bound; runs in the render pool, not on the event loop."""
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -74,16 +105,11 @@ async def export_summary_pdf(
     flow.append(Paragraph(f"Expense Summary — {year}-{month:02d}", title_style))
     flow.append(Spacer(1, 0.25 * inch))
 
-    total_resp = await get_monthly_total(user_id, month, year)
-    flow.append(Paragraph(f"Total spending: {total_resp.currency} {total_resp.total}", styles["Normal"]))
+    flow.append(Paragraph(f"Total spending: {currency} {total}", styles["Normal"]))
     flow.append(Spacer(1, 0.25 * inch))
 
-    dist = await get_category_distribution(user_id, month, year)
-    if dist.by_category:
-        data = [["Category", "Amount"]] + [
-            [item.category_name, f"{item.total} {item.currency}"]
-            for item in dist.by_category
-        ]
+    if category_rows:
+        data = [["Category", "Amount"]] + [list(row) for row in category_rows]
         t = Table(data, colWidths=[3 * inch, 1.5 * inch])
         t.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
@@ -100,9 +126,32 @@ async def export_summary_pdf(
     return buffer.read()
 
 
+async def export_summary_pdf(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+) -> bytes:
+    """Generate a one-page PDF summary for the given month: total and by-category breakdown."""
+    total_resp = await get_monthly_total(user_id, month, year)
+    dist = await get_category_distribution(user_id, month, year)
+    category_rows = [
+        (item.category_name, f"{item.total} {item.currency}")
+        for item in dist.by_category
+    ]
+    return await pdf_render_pool.run(
+        _render_summary_pdf,
+        month,
+        year,
+        total_resp.currency,
+        str(total_resp.total),
+        category_rows,
+    )
+
+
 class ExportService:
     expenses_csv = staticmethod(export_expenses_csv)
     summary_pdf = staticmethod(export_summary_pdf)
+    render_pool_stats = staticmethod(pdf_render_pool.stats)
 
 
 export_service = ExportService()
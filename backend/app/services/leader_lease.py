@@ -0,0 +1,117 @@
+"""
+Leader election over a Mongo lease document, so that scheduled jobs run in exactly
+one worker process even when several API workers or replicas are up.
+
+Every worker calls heartbeat() periodically. The holder extends its lease; the others
+try to take it over, which only succeeds once the holder has stopped renewing and
+the lease has expired, so failover is automatic after at most one lease TTL.
+"""
+import os
+import socket
+import uuid
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.models.scheduler_lease import SchedulerLease
+from app.utils import as_utc, utc_now
+
+
+class LeaderLease:
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._expires_at = None
+        self.acquisitions = 0
+        self.losses = 0
+        self.skipped_runs = 0
+
+    @property
+    def is_leader(self) -> bool:
+        """True while this worker holds an unexpired lease (by the local clock)."""
+        return self._expires_at is not None and self._expires_at > utc_now()
+
+    async def heartbeat(self) -> bool:
+        """Acquire or renew the lease; returns whether this worker is the leader."""
+        was_leader = self.is_leader
+        now = utc_now()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        collection = SchedulerLease.get_motor_collection()
+        try:
+            # Matches when the lease is ours or has lapsed; upserts when no lease exists yet.
+            # If another worker holds a live lease, the upsert hits the unique name index.
+            doc = await collection.find_one_and_update(
+                {
+                    "name": self.name,
+                    "$or": [{"holder": self.holder}, {"expires_at": {"$lte": now}}],
+                },
+                {
+                    "$set": {"holder": self.holder, "expires_at": expires_at, "heartbeat_at": now},
+                    "$setOnInsert": {"acquired_at": now},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            doc = None  # another worker holds a live lease
+        except Exception as e:
+            # Unreachable database: keep a held lease only until its local expiry
+            print(f"Scheduler lease heartbeat error: {e}")
+            if not self.is_leader:
+                self._expires_at = None
+            return self.is_leader
+        if doc is not None and doc.get("holder") == self.holder:
+            if not was_leader:
+                self.acquisitions += 1
+                print(f"Scheduler lease '{self.name}' acquired by {self.holder}")
+            self._expires_at = as_utc(doc["expires_at"])
+        else:
+            if was_leader:
+                self.losses += 1
+                print(f"Scheduler lease '{self.name}' lost by {self.holder}")
+            self._expires_at = None
+        return self.is_leader
+
+    async def release(self) -> None:
+        """Give up the lease (on shutdown) so another worker can take over immediately."""
+        if self._expires_at is None:
+            return
+        self._expires_at = None
+        try:
+            await SchedulerLease.get_motor_collection().update_one(
+                {"name": self.name, "holder": self.holder},
+                {"$set": {"expires_at": utc_now()}},
+            )
+        except Exception as e:
+            print(f"Scheduler lease release error: {e}")
+
+    def leader_only(self, job: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wrap a scheduled job so it only runs in the worker holding the lease."""
+
+        @wraps(job)
+        async def wrapper(*args, **kwargs):
+            if not self.is_leader:
+                self.skipped_runs += 1
+                return None
+            return await job(*args, **kwargs)
+
+        return wrapper
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "ttl_seconds": self.ttl_seconds,
+            "acquisitions": self.acquisitions,
+            "losses": self.losses,
+            "skipped_runs": self.skipped_runs,
+        }
+
+
+scheduler_lease = LeaderLease("scheduler", settings.SCHEDULER_LEASE_TTL_SECONDS)
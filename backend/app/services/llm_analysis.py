@@ -3,15 +3,17 @@ LLM-powered spending behavior analysis service.
 Detects spending spikes, lifestyle patterns, and trends.
 """
 
+import asyncio
+import json
 import os
 from datetime import date, timedelta
 from decimal import Decimal
 from statistics import mean, stdev
+from typing import AsyncIterator
 
 from beanie import PydanticObjectId
 
 from app.models.expense import Expense
-from app.models.category import Category
 from app.schemas.analysis_behavior import (
     SpendingSpike,
     LifestyleProfile,
@@ -19,6 +21,9 @@ from app.schemas.analysis_behavior import (
     SpendingTrend,
     BehaviorAnalysisResponse,
 )
+from app.services.category import category_service
+from app.services.llm_cache import fingerprint, get_cached_response, store_response
+from app.utils.rate_limit import FairRateLimiter
 
 
 # LLM Configuration
@@ -26,104 +31,373 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_TEMPERATURE = 0.4
+# Rate limits (per minute) across this worker and per user; requests over budget queue
+LLM_GLOBAL_RPM = int(os.getenv("LLM_GLOBAL_RPM", "60"))
+LLM_GLOBAL_TPM = int(os.getenv("LLM_GLOBAL_TPM", "100000"))
+LLM_USER_RPM = int(os.getenv("LLM_USER_RPM", "10"))
+LLM_USER_TPM = int(os.getenv("LLM_USER_TPM", "20000"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "20"))
 
 # Cache LLM client to avoid recreation
 _llm_client = None
+# Global cap on in-flight completions across all requests in this worker
+_llm_semaphore: asyncio.Semaphore | None = None
 
 
 def _get_llm_client():
-    """Initialize LLM client based on provider"""
+    """Initialize async LLM client based on provider (one pooled HTTP connection set per worker)"""
     global _llm_client
     
     if _llm_client is not None:
         return _llm_client
-    
+
+    if LLM_PROVIDER == "stub":
+        from app.services.llm_stub import StubLLMClient
+        _llm_client = StubLLMClient()
+        return _llm_client
+
+    import httpx
+
+    # Docker environment has proxy environment variables that break httpx
+    # Create a custom httpx client with mounts to bypass proxy detection
+    _limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+    )
+    _transport = httpx.AsyncHTTPTransport(verify=True, limits=_limits)
+    _mounts = {
+        "https://": _transport,
+        "http://": _transport,
+    }
+    http_client = httpx.AsyncClient(mounts=_mounts, timeout=LLM_TIMEOUT_SECONDS)
+
     if LLM_PROVIDER == "openai":
-        from openai import OpenAI
-        _llm_client = OpenAI(api_key=OPENAI_API_KEY)
+        from openai import AsyncOpenAI
+        _llm_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client, max_retries=1)
     elif LLM_PROVIDER == "groq":
-        from groq import Groq
-        import httpx
-        
-        # Docker environment has proxy environment variables that break httpx
-        # Create a custom httpx client with mounts to bypass proxy detection
-        _transport = httpx.HTTPTransport(verify=True)
-        _mounts = {
-            "https://": _transport,
-            "http://": _transport,
-        }
-        http_client = httpx.Client(mounts=_mounts)
-        _llm_client = Groq(api_key=GROQ_API_KEY, http_client=http_client)
+        from groq import AsyncGroq
+        _llm_client = AsyncGroq(api_key=GROQ_API_KEY, http_client=http_client, max_retries=1)
     else:
         raise ValueError(f"Unsupported LLM provider: {LLM_PROVIDER}")
     
     return _llm_client
 
 
-def _call_llm(system_prompt: str, user_prompt: str) -> str:
-    """Call LLM with system and user prompts"""
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _llm_semaphore
+
+
+llm_rate_limiter = FairRateLimiter(
+    global_rpm=LLM_GLOBAL_RPM,
+    global_tpm=LLM_GLOBAL_TPM,
+    user_rpm=LLM_USER_RPM,
+    user_tpm=LLM_USER_TPM,
+)
+
+
+def _estimate_tokens(system_prompt: str, user_prompt: str, max_tokens: int) -> int:
+    """Rough upper bound for budgeting: ~4 characters per prompt token plus the completion cap."""
+    return (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+
+
+async def _wait_for_rate_limit(
+    user_id: PydanticObjectId | None,
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int,
+) -> None:
+    """Wait for a slot in the global and per-user budgets; raises RateLimitExceeded on timeout."""
+    await llm_rate_limiter.acquire(
+        str(user_id) if user_id is not None else "system",
+        _estimate_tokens(system_prompt, user_prompt, max_tokens),
+        timeout=LLM_QUEUE_TIMEOUT_SECONDS,
+    )
+
+
+def llm_rate_limit_stats() -> dict:
+    return llm_rate_limiter.stats()
+
+
+async def _call_llm(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 500,
+    json_mode: bool = False,
+    use_cache: bool = True,
+    cache_forever: bool = False,
+    user_id: PydanticObjectId | None = None,
+) -> str:
+    """
+    Call LLM with system and user prompts without blocking the event loop.
+    Identical prompts are answered from the LLM response cache; cache_forever keeps the
+    entry without TTL (for inputs that can no longer change, e.g. closed months).
+    Cache misses are rate limited per user_id (None counts as system traffic).
+    """
+    cache_key = fingerprint(LLM_MODEL, system_prompt, user_prompt, LLM_TEMPERATURE)
+    if use_cache:
+        try:
+            cached = await get_cached_response(cache_key)
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            cached = None
+        if cached is not None:
+            return cached
     try:
         client = _get_llm_client()
-        
-        # Create completion request
-        response = client.chat.completions.create(
-            model=LLM_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-            max_tokens=500,
-        )
-        return response.choices[0].message.content.strip()
+        await _wait_for_rate_limit(user_id, system_prompt, user_prompt, max_tokens)
+
+        # Create completion request (bounded by the global concurrency cap and a per-call timeout)
+        async with _get_llm_semaphore():
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=LLM_TEMPERATURE,
+                    max_tokens=max_tokens,
+                    **({"response_format": {"type": "json_object"}} if json_mode else {}),
+                ),
+                timeout=LLM_TIMEOUT_SECONDS,
+            )
+        text = response.choices[0].message.content.strip()
     except Exception as e:
         print(f"LLM API error: {e}")
         import traceback
         traceback.print_exc()
-        # Return fallback text on error
+        # Return fallback text on error (never cached)
         return "Unable to generate insight at this time."
+    if use_cache:
+        usage = getattr(response, "usage", None)
+        tokens = (getattr(usage, "total_tokens", None) or 0) if usage else 0
+        try:
+            await store_response(cache_key, LLM_MODEL, text, tokens, keep_forever=cache_forever)
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+    return text
+
+
+async def _stream_llm(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 500,
+    user_id: PydanticObjectId | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream completion text as the provider produces it.
+    If the consumer stops iterating (e.g. the client disconnected) the provider
+    stream is closed so generation is not paid for.
+    Raises RateLimitExceeded if no rate-limit slot frees up in time.
+    """
+    client = _get_llm_client()
+    await _wait_for_rate_limit(user_id, system_prompt, user_prompt, max_tokens)
+    async with _get_llm_semaphore():
+        stream = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=LLM_TEMPERATURE,
+                max_tokens=max_tokens,
+                stream=True,
+            ),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+
+# Fallback text used when the LLM omits or fails to produce an item
+SPIKE_FALLBACK = "Unable to generate insight at this time."
+TREND_FALLBACK = "Unable to generate insight at this time."
+LIFESTYLE_FALLBACK = "Unable to generate insight at this time."
+SUMMARY_FALLBACK = "Unable to generate insight at this time."
+
+
+def _parse_json_object(text: str) -> dict:
+    """Parse the model's JSON reply; tolerate code fences and return {} on failure."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):]
+    try:
+        data = json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            data = json.loads(text[start:end + 1]) if start != -1 and end > start else {}
+        except ValueError:
+            data = {}
+    return data if isinstance(data, dict) else {}
+
+
+def _text_or(value, fallback: str) -> str:
+    return value.strip() if isinstance(value, str) and value.strip() else fallback
+
+
+async def _generate_insights(
+    month: int,
+    year: int,
+    spikes: list[SpendingSpike],
+    lifestyle: LifestyleProfile,
+    trends: list[SpendingTrend],
+    user_id: PydanticObjectId | None = None,
+) -> tuple[str, bool]:
+    """
+    Fill every spike description, trend insight and the lifestyle insight, and return
+    the overall summary, using a single JSON-structured LLM call.
+    The flag is False when the reply was missing or unparseable (an API error, rate
+    limit or malformed JSON) and everything was filled with fallback text.
+    """
+    spike_lines = "\n".join(
+        f"S{i}: Category: {s.category_name}; normal average: ${float(s.average_amount):.2f}; "
+        f"expense: ${float(s.amount):.2f}; increase: {s.percentage_increase:.1f}%"
+        for i, s in enumerate(spikes, 1)
+    ) or "None"
+    trend_lines = "\n".join(
+        f"T{i}: Category: {t.category_name}; change over {t.months_analyzed} months: "
+        f"{t.trend_percentage:+.1f}%; direction: {t.direction}"
+        for i, t in enumerate(trends, 1)
+    ) or "None"
+    category_text = ", ".join(
+        f"{c.category_name} ({c.percentage}%)" for c in lifestyle.top_categories
+    ) or "No spending data"
+
+    system_prompt = """You are a personal finance analyst.
+You receive a user's spending spikes, category trends and lifestyle breakdown for one month.
+Reply with a single JSON object and nothing else, using exactly these keys:
+"spikes": object mapping each spike id (S1, S2, ...) to a 1-2 sentence insight on possible causes, whether it is concerning, and a recommendation;
+"trends": object mapping each trend id (T1, T2, ...) to a 1-2 sentence explanation of the trend and its implications;
+"lifestyle": 2-3 sentences describing the spending lifestyle and what it reveals about priorities;
+"summary": 4-5 sentences with 3-4 key takeaways, encouraging but honest about areas for improvement."""
+
+    user_prompt = f"""User spending analysis for {month}/{year}:
+
+Spending spikes:
+{spike_lines}
+
+Spending trends:
+{trend_lines}
+
+Lifestyle profile: {lifestyle.profile_type}
+Spending breakdown: {category_text}"""
+
+    today = date.today()
+    month_closed = (year, month) < (today.year, today.month)
+    raw = await _call_llm(
+        system_prompt,
+        user_prompt,
+        max_tokens=1500,
+        json_mode=True,
+        cache_forever=month_closed,
+        user_id=user_id,
+    )
+    data = _parse_json_object(raw)
+    spike_insights = data.get("spikes") if isinstance(data.get("spikes"), dict) else {}
+    trend_insights = data.get("trends") if isinstance(data.get("trends"), dict) else {}
+
+    for i, spike in enumerate(spikes, 1):
+        spike.description = _text_or(spike_insights.get(f"S{i}"), SPIKE_FALLBACK)
+    for i, trend in enumerate(trends, 1):
+        trend.insight = _text_or(trend_insights.get(f"T{i}"), TREND_FALLBACK)
+    if lifestyle.top_categories:
+        lifestyle.insights = _text_or(data.get("lifestyle"), LIFESTYLE_FALLBACK)
+    generated = isinstance(data.get("summary"), str) and bool(data["summary"].strip())
+    return _text_or(data.get("summary"), SUMMARY_FALLBACK), generated
 
 
 async def _get_category_name(category_id: str) -> str:
-    """Get category name from ID"""
+    """Get category name from ID (served from the category name cache)"""
     try:
-        cat = await Category.get(category_id)
-        return cat.name if cat else "Unknown"
-    except:
+        oid = PydanticObjectId(category_id)
+        return (await category_service.names([oid]))[oid]
+    except Exception:
         return "Unknown"
 
 
+def _month_range(month: int, year: int) -> tuple[date, date]:
+    """First and last day of the month"""
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end = date(year, month + 1, 1) - timedelta(days=1)
+    return start, end
+
+
+def _months_back(month: int, year: int, num_months: int) -> list[tuple[int, int]]:
+    """(month, year) for the given month and the num_months - 1 before it, oldest first"""
+    months_data = []
+    for i in range(num_months):
+        m = month - i
+        y = year
+        if m <= 0:
+            m += 12
+            y -= 1
+        months_data.append((m, y))
+    months_data.reverse()
+    return months_data
+
+
+def _between(expenses: list[Expense], start: date, end: date) -> list[Expense]:
+    return [e for e in expenses if start <= e.date <= end]
+
+
+async def _fetch_expenses(user_id: PydanticObjectId, start: date, end: date) -> list[Expense]:
+    return await Expense.find(
+        Expense.user_id == user_id,
+        Expense.date >= start,
+        Expense.date <= end,
+    ).to_list()
+
+
+# Days of history before the month used as the spike baseline
+SPIKE_BASELINE_DAYS = 90
+
+
+def analysis_window(month: int, year: int, num_trend_months: int = 3) -> tuple[date, date]:
+    """Smallest date range covering the spike baseline, the lifestyle month and the trend months"""
+    start, end = _month_range(month, year)
+    trend_m, trend_y = _months_back(month, year, num_trend_months)[0]
+    trend_start, _ = _month_range(trend_m, trend_y)
+    return min(start - timedelta(days=SPIKE_BASELINE_DAYS), trend_start), end
+
+
 async def detect_spending_spikes(
     user_id: PydanticObjectId,
     month: int,
     year: int,
+    expenses: list[Expense] | None = None,
 ) -> list[SpendingSpike]:
     """
     Detect unusual spending spikes compared to historical average.
     Uses statistical method: flag expenses > (mean + 2 * std_dev)
+    expenses, if given, must cover the 90-day baseline and the month; otherwise they are fetched.
     """
     spikes = []
     
-    # Get current month expenses
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
-    
-    current_month_expenses = await Expense.find(
-        Expense.user_id == user_id,
-        Expense.date >= start_date,
-        Expense.date <= end_date,
-    ).to_list()
+    start_date, end_date = _month_range(month, year)
+    baseline_start = start_date - timedelta(days=SPIKE_BASELINE_DAYS)
+    if expenses is None:
+        expenses = await _fetch_expenses(user_id, baseline_start, end_date)
     
-    # Get last 90 days for baseline
-    baseline_start = start_date - timedelta(days=90)
-    baseline_expenses = await Expense.find(
-        Expense.user_id == user_id,
-        Expense.date >= baseline_start,
-        Expense.date < start_date,
-    ).to_list()
+    # Current month expenses, and the last 90 days before it for baseline
+    current_month_expenses = _between(expenses, start_date, end_date)
+    baseline_expenses = _between(expenses, baseline_start, start_date - timedelta(days=1))
     
     # Group by category
     category_baseline = {}
@@ -133,80 +407,55 @@ async def detect_spending_spikes(
             category_baseline[cat_id] = []
         category_baseline[cat_id].append(float(exp.amount))
     
-    # Check current month expenses for spikes
-    for exp in current_month_expenses:
-        cat_id = str(exp.category_id)
-        
-        if cat_id not in category_baseline or len(category_baseline[cat_id]) < 3:
+    # Baseline stats computed once per category: (mean, mean + 2 * std_dev)
+    category_stats: dict[str, tuple[float, float]] = {}
+    for cat_id, baseline_amounts in category_baseline.items():
+        if len(baseline_amounts) < 3:
             continue  # Not enough data
-        
-        baseline_amounts = category_baseline[cat_id]
         avg = mean(baseline_amounts)
-        
-        # Only calculate std_dev if we have enough variation
-        if len(baseline_amounts) > 1:
-            std_dev_val = stdev(baseline_amounts)
-        else:
-            std_dev_val = avg * 0.1  # Default to 10% of average
-        
-        # Check if this expense is an outlier (mean + 2 * std_dev)
-        threshold = avg + (2 * std_dev_val)
-        
-        if exp.amount > threshold:
-            percentage_increase = ((float(exp.amount) - avg) / avg) * 100 if avg > 0 else 0
-            
-            # Generate LLM insight
-            cat_name = await _get_category_name(cat_id)
-            system_prompt = """You are a personal finance analyst. 
-Analyze unusual spending and provide a brief, actionable insight.
-Focus on: possible causes, whether it's concerning, and recommendations.
-Keep response to 1-2 sentences."""
-            
-            user_prompt = f"""Spending spike analysis:
-Category: {cat_name}
-Normal monthly average: ${avg:.2f}
-Current expense: ${float(exp.amount):.2f}
-Increase: {percentage_increase:.1f}%
-
-Provide insight about this spike."""
-            
-            description = _call_llm(system_prompt, user_prompt)
-            
-            spikes.append(
-                SpendingSpike(
-                    category_id=cat_id,
-                    category_name=cat_name,
-                    amount=exp.amount,
-                    average_amount=Decimal(str(round(avg, 2))),
-                    percentage_increase=round(percentage_increase, 1),
-                    date=exp.date,
-                    description=description,
-                )
+        category_stats[cat_id] = (avg, avg + 2 * stdev(baseline_amounts))
+    
+    # Check current month expenses against their category's threshold in one pass
+    outliers = [
+        (exp, category_stats[str(exp.category_id)][0])
+        for exp in current_month_expenses
+        if str(exp.category_id) in category_stats
+        and float(exp.amount) > category_stats[str(exp.category_id)][1]
+    ][:5]
+    names = await category_service.names([exp.category_id for exp, _ in outliers])
+    
+    for exp, avg in outliers:
+        percentage_increase = ((float(exp.amount) - avg) / avg) * 100 if avg > 0 else 0
+        spikes.append(
+            SpendingSpike(
+                category_id=str(exp.category_id),
+                category_name=names[exp.category_id],
+                amount=exp.amount,
+                average_amount=Decimal(str(round(avg, 2))),
+                percentage_increase=round(percentage_increase, 1),
+                date=exp.date,
+                description=SPIKE_FALLBACK,
             )
+        )
     
-    return spikes[:5]  # Return top 5 spikes
+    return spikes  # At most the first 5 spikes
 
 
 async def identify_lifestyle_profile(
     user_id: PydanticObjectId,
     month: int,
     year: int,
+    expenses: list[Expense] | None = None,
 ) -> LifestyleProfile:
     """
     Identify user's spending lifestyle based on category distribution.
     Returns profile type and top categories.
+    expenses, if given, must cover the month; otherwise they are fetched.
     """
-    start_date = date(year, month, 1)
-    if month == 12:
-        end_date = date(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        end_date = date(year, month + 1, 1) - timedelta(days=1)
-    
-    expenses = await Expense.find(
-        Expense.user_id == user_id,
-        Expense.date >= start_date,
-        Expense.date <= end_date,
-    ).to_list()
+    start_date, end_date = _month_range(month, year)
+    if expenses is None:
+        expenses = await _fetch_expenses(user_id, start_date, end_date)
+    expenses = _between(expenses, start_date, end_date)
     
     total_spend = sum(e.amount for e in expenses)
     
@@ -255,25 +504,10 @@ async def identify_lifestyle_profile(
         elif any(x in top_cat_name for x in ["entertainment", "leisure", "gaming"]):
             profile_type = "entertainment_heavy"
     
-    # Generate LLM insight
-    category_text = ", ".join([f"{c.category_name} ({c.percentage}%)" for c in top_categories])
-    system_prompt = """You are a lifestyle analyst. 
-Analyze spending categories and describe the person's spending lifestyle.
-Be concise and specific. Highlight lifestyle implications.
-Keep to 2-3 sentences."""
-    
-    user_prompt = f"""Spending breakdown:
-{category_text}
-Profile: {profile_type}
-
-Describe this person's spending lifestyle and what it reveals about their priorities."""
-    
-    insights = _call_llm(system_prompt, user_prompt)
-    
     return LifestyleProfile(
         profile_type=profile_type,
         top_categories=top_categories,
-        insights=insights,
+        insights=LIFESTYLE_FALLBACK,
     )
 
 
@@ -282,40 +516,24 @@ async def detect_spending_trends(
     month: int,
     year: int,
     num_months: int = 3,
+    expenses: list[Expense] | None = None,
 ) -> list[SpendingTrend]:
     """
     Detect spending trends over time.
     Analyzes month-over-month changes in major categories.
+    expenses, if given, must cover all num_months months; otherwise they are fetched.
     """
     trends = []
     
-    # Get current month and previous months
-    months_data = []
-    for i in range(num_months):
-        m = month - i
-        y = year
-        if m <= 0:
-            m += 12
-            y -= 1
-        months_data.append((m, y))
-    
-    months_data.reverse()  # Oldest to newest
+    # Get current month and previous months (oldest to newest)
+    months_data = _months_back(month, year, num_months)
+    if expenses is None:
+        first_start, _ = _month_range(*months_data[0])
+        _, last_end = _month_range(month, year)
+        expenses = await _fetch_expenses(user_id, first_start, last_end)
     
-    # Get expenses for each month
-    monthly_expenses = []
-    for m, y in months_data:
-        start = date(y, m, 1)
-        if m == 12:
-            end = date(y + 1, 1, 1) - timedelta(days=1)
-        else:
-            end = date(y, m + 1, 1) - timedelta(days=1)
-        
-        expenses = await Expense.find(
-            Expense.user_id == user_id,
-            Expense.date >= start,
-            Expense.date <= end,
-        ).to_list()
-        monthly_expenses.append(expenses)
+    # Split expenses by month
+    monthly_expenses = [_between(expenses, *_month_range(m, y)) for m, y in months_data]
     
     # Group by category and find trends
     all_categories = set()
@@ -351,20 +569,6 @@ async def detect_spending_trends(
         
         if direction != "stable":
             cat_name = await _get_category_name(cat_id)
-            system_prompt = """You are a financial trend analyst.
-Explain spending trend changes and their implications.
-Be specific about causes and recommendations.
-Keep to 1-2 sentences."""
-            
-            user_prompt = f"""Spending trend for {cat_name}:
-3 months ago: ${first_amount:.2f}
-Current: ${last_amount:.2f}
-Change: {trend_percentage:+.1f}%
-Direction: {direction}
-
-Explain this trend and its implications."""
-            
-            insight = _call_llm(system_prompt, user_prompt)
             
             trends.append(
                 SpendingTrend(
@@ -373,49 +577,35 @@ Explain this trend and its implications."""
                     direction=direction,
                     trend_percentage=round(trend_percentage, 1),
                     months_analyzed=num_months,
-                    insight=insight,
+                    insight=TREND_FALLBACK,
                 )
             )
     
     return sorted(trends, key=lambda x: abs(x.trend_percentage), reverse=True)[:5]
 
 
-async def generate_behavior_analysis(
+async def analyze_behavior(
     user_id: PydanticObjectId,
     month: int,
     year: int,
-) -> BehaviorAnalysisResponse:
+) -> tuple[BehaviorAnalysisResponse, bool]:
     """
     Generate comprehensive behavior analysis combining all components.
+    The detectors only compute numbers; every insight and the summary come from one LLM call.
+    Also returns whether that call produced the insights (False means fallback text).
     """
-    # Get all components
-    spikes = await detect_spending_spikes(user_id, month, year)
-    lifestyle = await identify_lifestyle_profile(user_id, month, year)
-    trends = await detect_spending_trends(user_id, month, year)
-    
-    # Generate overall summary
-    spike_text = f"{len(spikes)} unusual spikes detected" if spikes else "No unusual spikes"
-    trend_text = f"{len(trends)} significant trends" if trends else "Spending patterns stable"
-    
-    system_prompt = """You are a comprehensive financial analyst.
-Summarize spending behavior analysis in a helpful, actionable way.
-Provide 3-4 key takeaways about the user's finances.
-Be encouraging but honest about areas for improvement.
-Keep to 4-5 sentences."""
+    # One fetch of the widest window, shared by all detectors running concurrently
+    window_start, window_end = analysis_window(month, year)
+    expenses = await _fetch_expenses(user_id, window_start, window_end)
+    spikes, lifestyle, trends = await asyncio.gather(
+        detect_spending_spikes(user_id, month, year, expenses=expenses),
+        identify_lifestyle_profile(user_id, month, year, expenses=expenses),
+        detect_spending_trends(user_id, month, year, expenses=expenses),
+    )
     
-    user_prompt = f"""User spending analysis for {month}/{year}:
-
-Profile: {lifestyle.profile_type}
-Spikes: {spike_text}
-Trends: {trend_text}
+    summary, generated = await _generate_insights(month, year, spikes, lifestyle, trends, user_id=user_id)
 
-Top categories: {', '.join(c.category_name for c in lifestyle.top_categories[:3])}
-
-Provide a comprehensive summary and key recommendations."""
-    
-    summary = _call_llm(system_prompt, user_prompt)
-    
-    return BehaviorAnalysisResponse(
+    result = BehaviorAnalysisResponse(
         period="monthly",
         analysis_date=date.today(),
         month=month,
@@ -424,4 +614,15 @@ Provide a comprehensive summary and key recommendations."""
         lifestyle_profile=lifestyle,
         trends=trends,
         summary=summary,
-    )
\ No newline at end of file
+    )
+    return result, generated
+
+
+async def generate_behavior_analysis(
+    user_id: PydanticObjectId,
+    month: int,
+    year: int,
+) -> BehaviorAnalysisResponse:
+    """Generate comprehensive behavior analysis combining all components."""
+    result, _ = await analyze_behavior(user_id, month, year)
+    return result
@@ -0,0 +1,83 @@
+"""
+Persistent cache for LLM completions.
+
+Entries are keyed by a SHA-256 fingerprint of (model, system prompt, user prompt,
+temperature), stored in Mongo with a TTL index and fronted by an in-process LRU.
+"""
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+from beanie.odm.operators.find.logical import Or
+from pymongo.errors import DuplicateKeyError
+
+from app.models.llm_cache import LlmCacheEntry
+from app.utils import utc_now
+from app.utils.cache import UserCache, MISSING
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+
+# Single partition: LLM responses are not per-user data and are never invalidated
+_PARTITION = "llm"
+_memory = UserCache(max_entries=LLM_CACHE_MEMORY_ENTRIES, ttl_seconds=3600)
+_stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "tokens_saved": 0}
+
+
+def fingerprint(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    payload = json.dumps([model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_cached_response(key: str) -> str | None:
+    """Return a cached completion (memory first, then Mongo) or None."""
+    entry = _memory.get((_PARTITION, key))
+    if entry is not MISSING:
+        _stats["memory_hits"] += 1
+        _stats["tokens_saved"] += entry[1]
+        return entry[0]
+    # The TTL monitor only runs about once a minute, so filter out expired entries too
+    stored = await LlmCacheEntry.find_one(
+        LlmCacheEntry.key == key,
+        Or(LlmCacheEntry.expires_at == None, LlmCacheEntry.expires_at > utc_now()),
+    )
+    if stored is None:
+        _stats["misses"] += 1
+        return None
+    _memory.set((_PARTITION, key), (stored.response, stored.total_tokens))
+    _stats["store_hits"] += 1
+    _stats["tokens_saved"] += stored.total_tokens
+    return stored.response
+
+
+async def store_response(
+    key: str,
+    model: str,
+    response: str,
+    total_tokens: int,
+    keep_forever: bool = False,
+) -> None:
+    """Save a completion; keep_forever skips the TTL (e.g. analyses of closed months)."""
+    _memory.set((_PARTITION, key), (response, total_tokens))
+    expires_at = None if keep_forever else utc_now() + timedelta(seconds=LLM_CACHE_TTL_SECONDS)
+    try:
+        await LlmCacheEntry(
+            key=key,
+            model=model,
+            response=response,
+            total_tokens=total_tokens,
+            expires_at=expires_at,
+        ).insert()
+    except DuplicateKeyError:
+        pass  # a concurrent request stored the same prompt first
+
+
+def llm_cache_stats() -> dict:
+    lookups = _stats["memory_hits"] + _stats["store_hits"] + _stats["misses"]
+    hits = _stats["memory_hits"] + _stats["store_hits"]
+    return {
+        **_stats,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "memory_entries": _memory.stats()["entries"],
+    }
@@ -0,0 +1,117 @@
+"""
+In-process stand-in for the OpenAI/Groq async clients (LLM_PROVIDER=stub).
+
+Used to benchmark behavior analysis and the chat endpoints without network access.
+Output is derived from a hash of the prompt, so identical prompts give identical
+text; latency, token throughput and failure rate are configurable.
+JSON-mode requests get an object with an entry for every S<n>/T<n> id in the prompt,
+so the insight parsing path is exercised the same way as with a real model.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from types import SimpleNamespace
+from typing import AsyncIterator
+
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "200"))
+LLM_STUB_TOKENS_PER_SECOND = float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", "200"))
+LLM_STUB_FAILURE_RATE = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+LLM_STUB_OUTPUT_TOKENS = int(os.getenv("LLM_STUB_OUTPUT_TOKENS", "80"))
+LLM_STUB_SEED = int(os.getenv("LLM_STUB_SEED", "0"))
+
+_WORDS = (
+    "spending budget savings category month trend review income expense plan "
+    "consider reduce track goal habit average increase steady priority balance"
+).split()
+_ITEM_ID = re.compile(r"^([ST]\d+):", re.MULTILINE)
+
+
+class StubLLMError(Exception):
+    """Injected failure, raised at LLM_STUB_FAILURE_RATE."""
+
+
+def _sentence(seed: str, num_words: int) -> str:
+    digest = hashlib.sha256(seed.encode()).digest()
+    words = [_WORDS[digest[i % len(digest)] % len(_WORDS)] for i in range(max(num_words, 1))]
+    return " ".join(words).capitalize() + "."
+
+
+def _completion_text(messages: list[dict], max_tokens: int, json_mode: bool) -> str:
+    prompt = "\n".join(m["content"] for m in messages)
+    num_words = min(max_tokens, LLM_STUB_OUTPUT_TOKENS)
+    if not json_mode:
+        return _sentence(prompt, num_words)
+    ids = _ITEM_ID.findall(messages[-1]["content"])
+    per_item = max(num_words // (len(ids) + 2), 4)
+    return json.dumps({
+        "spikes": {i: _sentence(prompt + i, per_item) for i in ids if i.startswith("S")},
+        "trends": {i: _sentence(prompt + i, per_item) for i in ids if i.startswith("T")},
+        "lifestyle": _sentence(prompt + "lifestyle", per_item),
+        "summary": _sentence(prompt + "summary", per_item),
+    })
+
+
+class _StubStream:
+    def __init__(self, text: str):
+        self._text = text
+        self.closed = False
+
+    async def _chunks(self) -> AsyncIterator[SimpleNamespace]:
+        words = self._text.split(" ")
+        for i, word in enumerate(words):
+            if self.closed:
+                return
+            if LLM_STUB_TOKENS_PER_SECOND > 0:
+                await asyncio.sleep(1 / LLM_STUB_TOKENS_PER_SECOND)
+            delta = SimpleNamespace(content=word if i == 0 else " " + word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _StubCompletions:
+    def __init__(self, rng: random.Random):
+        self._rng = rng
+
+    async def create(
+        self,
+        model: str,
+        messages: list[dict],
+        temperature: float = 0.0,
+        max_tokens: int = 500,
+        stream: bool = False,
+        response_format: dict | None = None,
+    ):
+        await asyncio.sleep(LLM_STUB_LATENCY_MS / 1000)
+        if self._rng.random() < LLM_STUB_FAILURE_RATE:
+            raise StubLLMError("stub LLM injected failure")
+        json_mode = (response_format or {}).get("type") == "json_object"
+        text = _completion_text(messages, max_tokens, json_mode)
+        if stream:
+            return _StubStream(text)
+        completion_tokens = len(text.split())
+        if LLM_STUB_TOKENS_PER_SECOND > 0:
+            await asyncio.sleep(completion_tokens / LLM_STUB_TOKENS_PER_SECOND)
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class StubLLMClient:
+    """Mimics client.chat.completions.create of the OpenAI/Groq async SDKs."""
+
+    def __init__(self, seed: int = LLM_STUB_SEED):
+        self.chat = SimpleNamespace(completions=_StubCompletions(random.Random(seed)))
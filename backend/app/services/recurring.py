@@ -1,33 +1,22 @@
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
 from beanie import PydanticObjectId
 from fastapi import HTTPException, status
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
+from app.config import settings
 from app.models.expense import Expense
 from app.models.recurring_rule import RecurringRule
 from app.schemas.recurring_rule import RecurringRuleCreate, RecurringRuleUpdate, RecurringRuleResponse
-from app.utils import utc_now
-
-
-def _next_run_from_frequency(from_dt: datetime, frequency: str) -> datetime:
-    if frequency == "daily":
-        return from_dt + timedelta(days=1)
-    if frequency == "weekly":
-        return from_dt + timedelta(days=7)
-    if frequency == "monthly":
-        y, m, d = from_dt.year, from_dt.month, from_dt.day
-        m += 1
-        if m > 12:
-            m -= 12
-            y += 1
-        try:
-            return from_dt.replace(year=y, month=m, day=min(d, 28))
-        except ValueError:
-            return from_dt.replace(year=y, month=m, day=1) + timedelta(days=d - 1)
-    if frequency == "yearly":
-        return from_dt.replace(year=from_dt.year + 1)
-    return from_dt + timedelta(days=1)
+from app.services.analytics import analytics_service
+from app.services.recurring_projection import next_run_from_frequency, recurring_projection_service
+from app.services.recurring_scheduler import recurring_scheduler
+from app.services.rollup import rollup_service
+from app.utils import as_utc, utc_now
+
+DUPLICATE_KEY_ERROR = 11000
 
 
 def _rule_to_response(r: RecurringRule) -> RecurringRuleResponse:
@@ -64,6 +53,8 @@ async def create_rule(
         next_run_at=when,
     )
     await rule.insert()
+    recurring_scheduler.notify(rule.next_run_at)
+    analytics_service.invalidate_user(user_id)  # projected totals include this rule
     return _rule_to_response(rule)
 
 
@@ -97,50 +88,125 @@ async def update_rule(
     for k, v in data.items():
         setattr(rule, k, v)
     await rule.save()
+    recurring_scheduler.notify(rule.next_run_at)
+    analytics_service.invalidate_user(user_id)
     return _rule_to_response(rule)
 
 
 async def delete_rule(rule_id: str, user_id: PydanticObjectId) -> None:
     rule = await get_rule(rule_id, user_id)
     await rule.delete()
+    analytics_service.invalidate_user(user_id)
+
+
+def _run_date(run_at: datetime) -> date:
+    return date(run_at.year, run_at.month, run_at.day)
+
+
+def _due_occurrences(rule: RecurringRule, when: datetime) -> list[datetime]:
+    """Every run time from next_run_at up to when, at most RECURRING_MAX_CATCHUP of them."""
+    occurrences = []
+    run_at = as_utc(rule.next_run_at)
+    while run_at <= when and len(occurrences) < settings.RECURRING_MAX_CATCHUP:
+        occurrences.append(run_at)
+        run_at = next_run_from_frequency(run_at, rule.frequency)
+    return occurrences
+
+
+async def _process_due_batch(rules: list[RecurringRule], when: datetime) -> int:
+    """
+    Create every missed occurrence of every rule with a single unordered insert_many and
+    advance every rule with a single bulk_write. Occurrences that already exist are
+    rejected by the unique (recurring_rule_id, date) index and count as done.
+    """
+    expenses: list[Expense] = []
+    owners: list[tuple[int, datetime]] = []  # per expense: (rule index, run time)
+    for i, rule in enumerate(rules):
+        for run_at in _due_occurrences(rule, when):
+            expenses.append(
+                Expense(
+                    id=PydanticObjectId(),
+                    user_id=rule.user_id,
+                    category_id=rule.category_id,
+                    amount=rule.amount,
+                    currency=rule.currency,
+                    date=_run_date(run_at),
+                    note=rule.note,
+                    is_recurring=True,
+                    recurring_rule_id=rule.id,
+                )
+            )
+            owners.append((i, run_at))
+    if not expenses:
+        return 0
+
+    failed: set[int] = set()
+    duplicates: set[int] = set()
+    try:
+        await Expense.insert_many(expenses, ordered=False)
+    except BulkWriteError as bwe:
+        for err in bwe.details.get("writeErrors", []):
+            if err.get("code") == DUPLICATE_KEY_ERROR:
+                duplicates.add(err["index"])
+            else:
+                rule = rules[owners[err["index"]][0]]
+                print(f"Recurring expense insert error (rule {rule.id}): {err.get('errmsg')}")
+                failed.add(err["index"])
+
+    inserted = [e for i, e in enumerate(expenses) if i not in failed and i not in duplicates]
+    if inserted:
+        await rollup_service.record(inserted)
+        for user_id in {e.user_id for e in inserted}:
+            analytics_service.invalidate_user(user_id)
+
+    # Each rule moves past its last handled occurrence, or back to its first failed one
+    # so that it is retried on the next run (occurrences after it dedupe via the index)
+    first_failed: dict[int, datetime] = {}
+    next_runs: dict[int, datetime] = {}
+    for j, (i, run_at) in enumerate(owners):
+        if j in failed:
+            first_failed.setdefault(i, run_at)
+        else:
+            next_runs[i] = next_run_from_frequency(run_at, rules[i].frequency)
+    next_runs.update(first_failed)
+    # The next_run_at guard skips rules that were edited while the batch ran
+    advances = [
+        UpdateOne(
+            {"_id": rules[i].id, "next_run_at": rules[i].next_run_at},
+            {"$set": {"next_run_at": next_run, "last_run_at": when, "updated_at": when}},
+        )
+        for i, next_run in next_runs.items()
+    ]
+    await RecurringRule.get_motor_collection().bulk_write(advances, ordered=False)
+    return len(inserted)
 
 
 async def process_due_rules(now: datetime | None = None) -> int:
     """
-    Find rules with next_run_at <= now, create an expense for each, advance next_run_at.
-    Returns count of expenses created. Avoids duplicates by checking existing expense for (rule_id, date).
+    Find rules with next_run_at <= now, create an expense for every occurrence missed
+    up to now (at most RECURRING_MAX_CATCHUP per rule per run), advance next_run_at.
+    Due rules are paged by _id in batches of RECURRING_BATCH_SIZE. Returns count of
+    expenses created; a unique index on (recurring_rule_id, date) prevents duplicates.
     """
     when = now or utc_now()
-    due = await RecurringRule.find(RecurringRule.next_run_at <= when).to_list()
     created = 0
-    for rule in due:
-        run_date = rule.next_run_at.date() if hasattr(rule.next_run_at, "date") else date(
-            rule.next_run_at.year, rule.next_run_at.month, rule.next_run_at.day
-        )
-        existing = await Expense.find_one(
-            Expense.recurring_rule_id == rule.id,
-            Expense.date == run_date,
-        )
-        if existing:
-            rule.next_run_at = _next_run_from_frequency(rule.next_run_at, rule.frequency)
-            rule.last_run_at = when
-            await rule.save()
-            continue
-        expense = Expense(
-            user_id=rule.user_id,
-            category_id=rule.category_id,
-            amount=rule.amount,
-            currency=rule.currency,
-            date=run_date,
-            note=rule.note,
-            is_recurring=True,
-            recurring_rule_id=rule.id,
+    last_id: PydanticObjectId | None = None
+    while True:
+        conditions = [RecurringRule.next_run_at <= when]
+        if last_id is not None:
+            conditions.append(RecurringRule.id > last_id)
+        rules = (
+            await RecurringRule.find(*conditions)
+            .sort(+RecurringRule.id)
+            .limit(settings.RECURRING_BATCH_SIZE)
+            .to_list()
         )
-        await expense.insert()
-        created += 1
-        rule.last_run_at = when
-        rule.next_run_at = _next_run_from_frequency(rule.next_run_at, rule.frequency)
-        await rule.save()
+        if not rules:
+            break
+        created += await _process_due_batch(rules, when)
+        last_id = rules[-1].id
+        if len(rules) < settings.RECURRING_BATCH_SIZE:
+            break
     return created
 
 
@@ -157,6 +223,7 @@ class RecurringService:
     update = staticmethod(update_rule)
     delete = staticmethod(delete_rule)
     process_due = staticmethod(process_due_rules)
+    projection = staticmethod(recurring_projection_service.expenses)
 
 
 recurring_service = RecurringService()
@@ -0,0 +1,43 @@
+"""
+One-time cleanup for the unique (recurring_rule_id, date) index on expenses.
+
+Before that index existed, overlapping scheduler runs could insert the same
+recurring expense twice; init_beanie would then fail to build the index and the
+app would not start. init_db runs remove_duplicate_recurring_expenses first,
+which keeps the oldest expense of each (rule, date) pair and deletes the rest.
+Works on the raw Motor database because Beanie is not initialised yet.
+"""
+from beanie import PydanticObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+RECURRING_UNIQUE_INDEX = "recurring_rule_id_1_date_1"
+
+
+async def remove_duplicate_recurring_expenses(database: AsyncIOMotorDatabase) -> set[PydanticObjectId]:
+    """
+    Delete duplicate generated expenses and return the ids of the users that had any,
+    so their rollups can be rebuilt. A no-op once the unique index exists.
+    """
+    expenses = database["expenses"]
+    if RECURRING_UNIQUE_INDEX in await expenses.index_information():
+        return set()
+    duplicates = expenses.aggregate([
+        {"$match": {"recurring_rule_id": {"$type": "objectId"}}},
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {"rule": "$recurring_rule_id", "date": "$date"},
+            "user_id": {"$first": "$user_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    extra_ids: list = []
+    user_ids: set[PydanticObjectId] = set()
+    async for group in duplicates:
+        extra_ids += group["ids"][1:]
+        user_ids.add(PydanticObjectId(group["user_id"]))
+    if extra_ids:
+        result = await expenses.delete_many({"_id": {"$in": extra_ids}})
+        print(f"Removed {result.deleted_count} duplicate recurring expenses for {len(user_ids)} users")
+    return user_ids
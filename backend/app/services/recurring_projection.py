@@ -0,0 +1,142 @@
+"""
+Virtual projection of recurring rules: the expenses each rule will create within a
+date window, expanded in memory from next_run_at without writing anything.
+Analytics uses it to include upcoming recurring spending in totals on request.
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+
+from app.models.recurring_rule import RecurringRule
+from app.schemas.recurring_rule import ProjectedExpenseResponse
+from app.utils import as_utc
+
+# Longest window a projection may cover (about ten years)
+PROJECTION_MAX_DAYS = 3660
+
+# Per date, per category: (sum of amounts, number of occurrences)
+ProjectedTotals = dict[date, dict[PydanticObjectId, tuple[Decimal, int]]]
+
+
+def next_run_from_frequency(from_dt: datetime, frequency: str) -> datetime:
+    if frequency == "daily":
+        return from_dt + timedelta(days=1)
+    if frequency == "weekly":
+        return from_dt + timedelta(days=7)
+    if frequency == "monthly":
+        y, m, d = from_dt.year, from_dt.month, from_dt.day
+        m += 1
+        if m > 12:
+            m -= 12
+            y += 1
+        try:
+            return from_dt.replace(year=y, month=m, day=min(d, 28))
+        except ValueError:
+            return from_dt.replace(year=y, month=m, day=1) + timedelta(days=d - 1)
+    if frequency == "yearly":
+        try:
+            return from_dt.replace(year=from_dt.year + 1)
+        except ValueError:  # Feb 29 in a non-leap year
+            return from_dt.replace(year=from_dt.year + 1, day=28)
+    return from_dt + timedelta(days=1)
+
+
+def _occurrence_ordinals(rule: RecurringRule, start: date, end: date) -> Iterable[int]:
+    """Proleptic ordinals of the dates in [start, end] on which rule will create an expense."""
+    run_at = as_utc(rule.next_run_at)
+    if rule.frequency not in ("monthly", "yearly"):
+        # Fixed-length steps: jump straight to the first occurrence, then plain integer steps
+        step = 7 if rule.frequency == "weekly" else 1
+        first = run_at.date().toordinal()
+        if first < start.toordinal():
+            first += -(-(start.toordinal() - first) // step) * step
+        return range(first, end.toordinal() + 1, step)
+    ordinals = []
+    while run_at.date() <= end:
+        if run_at.date() >= start:
+            ordinals.append(run_at.date().toordinal())
+        run_at = next_run_from_frequency(run_at, rule.frequency)
+    return ordinals
+
+
+def rule_occurrences(rule: RecurringRule, start: date, end: date) -> Iterator[date]:
+    """Dates in [start, end] on which rule will create an expense, from its next_run_at."""
+    return map(date.fromordinal, _occurrence_ordinals(rule, start, end))
+
+
+def _validate_window(start: date, end: date) -> None:
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start",
+        )
+    if (end - start).days > PROJECTION_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Projection window cannot exceed {PROJECTION_MAX_DAYS} days",
+        )
+
+
+async def _user_rules(user_id: PydanticObjectId) -> list[RecurringRule]:
+    return await RecurringRule.find(RecurringRule.user_id == user_id).to_list()
+
+
+def _totals(rules: Iterable[RecurringRule], start: date, end: date) -> ProjectedTotals:
+    # Count occurrences as day ordinals per (category, amount) group, so the hot loop is
+    # integer counting and each Decimal sum is computed once per group and day
+    days_by_group: dict[tuple[PydanticObjectId, Decimal], Counter[int]] = defaultdict(Counter)
+    for rule in rules:
+        days_by_group[(rule.category_id, rule.amount)].update(_occurrence_ordinals(rule, start, end))
+    out: ProjectedTotals = defaultdict(dict)
+    for (category_id, amount), days in days_by_group.items():
+        for ordinal, n in days.items():
+            by_category = out[date.fromordinal(ordinal)]
+            total, count = by_category.get(category_id, (Decimal("0"), 0))
+            by_category[category_id] = (total + amount * n, count + n)
+    return dict(out)
+
+
+async def project_expenses(
+    user_id: PydanticObjectId,
+    start: date,
+    end: date,
+) -> list[ProjectedExpenseResponse]:
+    """Every projected occurrence of the user's recurring rules in [start, end], by date."""
+    _validate_window(start, end)
+    rules = await _user_rules(user_id)
+    items = [
+        ProjectedExpenseResponse(
+            rule_id=str(rule.id),
+            category_id=str(rule.category_id),
+            amount=rule.amount,
+            currency=rule.currency,
+            note=rule.note,
+            date=day,
+        )
+        for rule in rules
+        for day in rule_occurrences(rule, start, end)
+    ]
+    items.sort(key=lambda i: (i.date, i.rule_id))
+    return items
+
+
+async def get_projected_totals(
+    user_id: PydanticObjectId,
+    start: date,
+    end: date,
+) -> ProjectedTotals:
+    """Projected recurring spending in [start, end] per date and category."""
+    _validate_window(start, end)
+    return _totals(await _user_rules(user_id), start, end)
+
+
+class RecurringProjectionService:
+    expenses = staticmethod(project_expenses)
+    totals = staticmethod(get_projected_totals)
+
+
+recurring_projection_service = RecurringProjectionService()
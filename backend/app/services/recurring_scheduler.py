@@ -0,0 +1,154 @@
+"""
+Event-driven runner for recurring rules.
+
+Keeps a min-heap of upcoming next_run_at times and sleeps until the earliest one
+instead of polling. RecurringService re-arms it when rules are created or updated
+in this worker. Rules changed through another worker are caught by the leader's
+periodic wake, which reads the earliest next_run_at (one indexed find_one), so they
+run at most a lease check interval late; the safety sweep also reloads the heap. Only the scheduler lease holder processes
+rules. When a run fails, or rules are still due right after one, the timer backs off
+exponentially instead of retrying in a tight loop.
+"""
+import asyncio
+import heapq
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from app.models.recurring_rule import RecurringRule
+from app.services.leader_lease import LeaderLease, scheduler_lease
+from app.utils import as_utc, utc_now
+
+# Upcoming run times loaded per reload; anything later is reached via later reloads
+HEAP_PRELOAD = 256
+# Retry delay after a failed or incomplete run, doubled per consecutive retry up to the max
+RETRY_BACKOFF_SECONDS = 1.0
+RETRY_BACKOFF_MAX_SECONDS = 300.0
+
+
+class RecurringScheduler:
+    def __init__(self, lease: LeaderLease):
+        self._lease = lease
+        self._heap: list[datetime] = []
+        self._armed = False
+        self._process_due: Callable[[datetime], Awaitable[int]] | None = None
+        self._lock = asyncio.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._retries = 0
+        self.runs = 0
+        self.failures = 0
+        self.expenses_created = 0
+
+    def notify(self, next_run_at: datetime) -> None:
+        """Re-arm for a rule created or rescheduled in this worker (leader only)."""
+        if not self._lease.is_leader:
+            return
+        heapq.heappush(self._heap, as_utc(next_run_at))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def reload(self) -> None:
+        """Rebuild the heap from the earliest next_run_at values in the database."""
+        try:
+            docs = await (
+                RecurringRule.get_motor_collection()
+                .find({}, {"next_run_at": 1})
+                .sort("next_run_at", 1)
+                .limit(HEAP_PRELOAD)
+                .to_list(HEAP_PRELOAD)
+            )
+        except Exception as e:
+            print(f"Recurring scheduler reload error: {e}")
+            self._armed = False
+            return
+        self._heap = [as_utc(d["next_run_at"]) for d in docs]  # sorted, so already a heap
+        self._armed = True
+
+    async def _check_earliest(self) -> None:
+        """Push the earliest next_run_at if it is sooner than the heap head (set elsewhere)."""
+        try:
+            doc = await RecurringRule.get_motor_collection().find_one(
+                {}, {"next_run_at": 1}, sort=[("next_run_at", 1)]
+            )
+        except Exception as e:
+            print(f"Recurring scheduler check error: {e}")
+            return
+        if doc is None:
+            return
+        earliest = as_utc(doc["next_run_at"])
+        if not self._heap or earliest < self._heap[0]:
+            heapq.heappush(self._heap, earliest)
+
+    async def run_due(self, now: datetime | None = None) -> int:
+        """Process every due rule, then reload the heap. Used by the timer and the sweep."""
+        async with self._lock:
+            created = 0
+            try:
+                created = await self._process_due(now or utc_now())
+                self.runs += 1
+                self.expenses_created += created
+            except Exception as e:
+                self.failures += 1
+                print(f"Recurring scheduler run error: {e}")
+            await self.reload()
+            return created
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(seconds, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        # Wake at least this often to notice lease changes and rules set by other workers
+        lease_check = max(self._lease.ttl_seconds / 3, 1)
+        while True:
+            self._wakeup.clear()
+            if not self._lease.is_leader:
+                self._armed = False
+                await self._sleep(lease_check)
+                continue
+            if not self._armed:
+                await self.reload()
+            else:
+                await self._check_earliest()
+            now = utc_now()
+            if self._heap and self._heap[0] <= now:
+                failures = self.failures
+                await self.run_due(now)
+                if self.failures > failures or (self._heap and self._heap[0] <= now):
+                    # Not asleep on _wakeup, so notify() cannot cut the backoff short
+                    await asyncio.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** self._retries, RETRY_BACKOFF_MAX_SECONDS))
+                    self._retries += 1
+                else:
+                    self._retries = 0
+                continue
+            until_next = (self._heap[0] - now).total_seconds() if self._heap else lease_check
+            await self._sleep(min(until_next, lease_check))
+
+    def start(self, process_due: Callable[[datetime], Awaitable[int]]) -> None:
+        self._process_due = process_due
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "armed": self._armed,
+            "heap_size": len(self._heap),
+            "next_run_at": self._heap[0].isoformat() if self._heap else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "expenses_created": self.expenses_created,
+        }
+
+
+recurring_scheduler = RecurringScheduler(scheduler_lease)
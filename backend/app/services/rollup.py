@@ -0,0 +1,272 @@
+"""
+Monthly expense rollups: (user, year, month, category) -> sum and count.
+
+Every expense write goes through apply_expense_change / record_expenses so the
+rollups stay in step with the expenses collection via atomic $inc upserts.
+rebuild_rollups / verify_rollups recompute them from raw expenses to repair drift.
+On startup ensure_rollups_seeded builds them once, unless a marker records that
+this was already done (rollup rows alone don't prove it: a single-user rebuild
+writes some).
+"""
+import asyncio
+from decimal import Decimal
+from typing import Iterable
+
+from beanie import PydanticObjectId
+from beanie.odm.operators.find.logical import And, Or
+from bson import Decimal128
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from app.models.expense import Expense
+from app.models.migration_marker import MigrationMarker
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.leader_lease import LeaderLease
+from app.utils import decimal_from_bson, utc_now
+
+RollupKey = tuple[PydanticObjectId, int, int, PydanticObjectId]  # user_id, year, month, category_id
+
+
+def _key(e: Expense) -> RollupKey:
+    return (e.user_id, e.date.year, e.date.month, e.category_id)
+
+
+def _key_filter(key: RollupKey) -> dict:
+    user_id, year, month, category_id = key
+    return {"user_id": user_id, "year": year, "month": month, "category_id": category_id}
+
+
+def _collect(deltas: dict[RollupKey, tuple[Decimal, int]], e: Expense, sign: int) -> None:
+    total, count = deltas.get(_key(e), (Decimal("0"), 0))
+    deltas[_key(e)] = (total + sign * e.amount, count + sign)
+
+
+async def _apply(deltas: dict[RollupKey, tuple[Decimal, int]]) -> None:
+    now = utc_now()
+    ops = [
+        UpdateOne(
+            _key_filter(key),
+            {"$inc": {"total": Decimal128(total), "expense_count": count}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        for key, (total, count) in deltas.items()
+        if total != 0 or count != 0
+    ]
+    if ops:
+        await MonthlyRollup.get_motor_collection().bulk_write(ops, ordered=False)
+
+
+async def apply_expense_change(before: Expense | None, after: Expense | None) -> None:
+    """
+    Apply one expense write to the rollups.
+    before=None is a create, after=None is a delete; both set is an update, which
+    handles moves between months or categories by decrementing the old row.
+    """
+    deltas: dict[RollupKey, tuple[Decimal, int]] = {}
+    if before is not None:
+        _collect(deltas, before, -1)
+    if after is not None:
+        _collect(deltas, after, 1)
+    await _apply(deltas)
+
+
+async def record_expenses(expenses: Iterable[Expense]) -> None:
+    """Add a batch of newly inserted expenses to the rollups in one bulk write."""
+    deltas: dict[RollupKey, tuple[Decimal, int]] = {}
+    for e in expenses:
+        _collect(deltas, e, 1)
+    await _apply(deltas)
+
+
+async def get_month_rollups(
+    user_id: PydanticObjectId,
+    year: int,
+    month: int,
+) -> list[MonthlyRollup]:
+    """Non-empty rollup rows for one user and month (one per category)."""
+    return await MonthlyRollup.find(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.year == year,
+        MonthlyRollup.month == month,
+        MonthlyRollup.expense_count > 0,
+    ).to_list()
+
+
+async def get_category_totals_for_months(
+    user_id: PydanticObjectId,
+    months: Iterable[tuple[int, int]],
+) -> dict[tuple[int, int], dict[PydanticObjectId, Decimal]]:
+    """
+    Per-category totals for several (year, month) pairs in one query.
+    Returns {(year, month): {category_id: total}}; months without spending map to {}.
+    """
+    months = set(months)
+    out: dict[tuple[int, int], dict[PydanticObjectId, Decimal]] = {ym: {} for ym in months}
+    if not months:
+        return out
+    rollups = await MonthlyRollup.find(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.expense_count > 0,
+        Or(*[And(MonthlyRollup.year == y, MonthlyRollup.month == m) for y, m in months]),
+    ).to_list()
+    for r in rollups:
+        out[(r.year, r.month)][r.category_id] = r.total
+    return out
+
+
+async def _compute_from_expenses(
+    user_id: PydanticObjectId | None,
+) -> dict[RollupKey, tuple[Decimal, int]]:
+    query = Expense.find(Expense.user_id == user_id) if user_id is not None else Expense.find()
+    rows = await query.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {
+                        "user_id": "$user_id",
+                        "year": {"$year": "$date"},
+                        "month": {"$month": "$date"},
+                        "category_id": "$category_id",
+                    },
+                    "total": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                }
+            }
+        ]
+    ).to_list()
+    return {
+        (
+            PydanticObjectId(r["_id"]["user_id"]),
+            r["_id"]["year"],
+            r["_id"]["month"],
+            PydanticObjectId(r["_id"]["category_id"]),
+        ): (decimal_from_bson(r["total"]), r["count"])
+        for r in rows
+    }
+
+
+async def _stored_rollups(user_id: PydanticObjectId | None) -> dict[RollupKey, MonthlyRollup]:
+    query = (
+        MonthlyRollup.find(MonthlyRollup.user_id == user_id)
+        if user_id is not None
+        else MonthlyRollup.find()
+    )
+    return {
+        (r.user_id, r.year, r.month, r.category_id): r
+        for r in await query.to_list()
+    }
+
+
+async def verify_rollups(user_id: PydanticObjectId | None = None) -> list[dict]:
+    """
+    Compare stored rollups against a fresh aggregation of expenses.
+    Returns one entry per drifted key (empty list when consistent).
+    """
+    expected = await _compute_from_expenses(user_id)
+    stored = await _stored_rollups(user_id)
+    drift = []
+    for key in expected.keys() | stored.keys():
+        exp_total, exp_count = expected.get(key, (Decimal("0"), 0))
+        row = stored.get(key)
+        got_total, got_count = (row.total, row.expense_count) if row else (Decimal("0"), 0)
+        if exp_total != got_total or exp_count != got_count:
+            user, year, month, category = key
+            drift.append({
+                "user_id": str(user),
+                "year": year,
+                "month": month,
+                "category_id": str(category),
+                "expected_total": exp_total,
+                "expected_count": exp_count,
+                "stored_total": got_total,
+                "stored_count": got_count,
+            })
+    return drift
+
+
+async def rebuild_rollups(user_id: PydanticObjectId | None = None) -> int:
+    """
+    Recompute rollups from raw expenses (one user, or everyone) and overwrite them.
+    Stale rows with no matching expenses are removed. Returns number of rows written.
+    Writes that land while the rebuild runs may be lost; run verify afterwards.
+    """
+    expected = await _compute_from_expenses(user_id)
+    stored = await _stored_rollups(user_id)
+    now = utc_now()
+    ops: list = [
+        ReplaceOne(
+            _key_filter(key),
+            {**_key_filter(key), "total": Decimal128(total), "expense_count": count, "updated_at": now},
+            upsert=True,
+        )
+        for key, (total, count) in expected.items()
+    ]
+    ops += [DeleteOne({"_id": row.id}) for key, row in stored.items() if key not in expected]
+    if ops:
+        await MonthlyRollup.get_motor_collection().bulk_write(ops, ordered=False)
+    return len(expected)
+
+
+ROLLUPS_SEEDED_MARKER = "monthly_rollups_seeded"
+
+
+async def rollups_seeded() -> bool:
+    return await MigrationMarker.find_one(MigrationMarker.name == ROLLUPS_SEEDED_MARKER) is not None
+
+
+async def mark_rollups_seeded() -> None:
+    await MigrationMarker.get_motor_collection().update_one(
+        {"name": ROLLUPS_SEEDED_MARKER},
+        {"$setOnInsert": {"name": ROLLUPS_SEEDED_MARKER, "completed_at": utc_now()}},
+        upsert=True,
+    )
+
+
+async def _seed_rollups() -> None:
+    if await rollups_seeded():
+        return
+    if await Expense.find_one() is not None:
+        print("Monthly rollups not built yet; building them from expenses")
+        await rebuild_rollups()
+        # Expense writes that landed during the rebuild may have been overwritten; redo those users
+        for user_id in {d["user_id"] for d in await verify_rollups()}:
+            await rebuild_rollups(PydanticObjectId(user_id))
+        print("Monthly rollups built")
+    await mark_rollups_seeded()
+
+
+async def ensure_rollups_seeded(poll_seconds: float = 2) -> None:
+    """
+    Build the rollups from expenses unless that was already done (first start after deploy).
+    Workers take a seed lease in turn, so exactly one rebuilds and the others wait for
+    it to finish instead of serving zero totals from a missing or half-built collection.
+    """
+    lease = LeaderLease("monthly_rollup_seed", ttl_seconds=30)
+
+    async def keep_alive() -> None:
+        while True:
+            await asyncio.sleep(lease.ttl_seconds / 3)
+            await lease.heartbeat()
+
+    while not await lease.heartbeat():
+        await asyncio.sleep(poll_seconds)
+    renew = asyncio.create_task(keep_alive())
+    try:
+        await _seed_rollups()
+    finally:
+        renew.cancel()
+        await lease.release()
+
+
+class RollupService:
+    apply_change = staticmethod(apply_expense_change)
+    record = staticmethod(record_expenses)
+    month = staticmethod(get_month_rollups)
+    category_totals_for_months = staticmethod(get_category_totals_for_months)
+    verify = staticmethod(verify_rollups)
+    rebuild = staticmethod(rebuild_rollups)
+    ensure_seeded = staticmethod(ensure_rollups_seeded)
+    is_seeded = staticmethod(rollups_seeded)
+    mark_seeded = staticmethod(mark_rollups_seeded)
+
+
+rollup_service = RollupService()
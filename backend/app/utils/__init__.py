@@ -7,6 +7,11 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (as returned by MongoDB) as UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
 def decimal_from_bson(value: object) -> Decimal:
     """Convert MongoDB Decimal128 or other numeric input to Python Decimal for Pydantic."""
     if value is None:
@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+MISSING = object()
+
+
+class UserCache:
+    """
+    In-process LRU cache with a per-entry TTL, partitioned by user so that all of a
+    user's entries can be dropped at once when their data changes.
+    Each worker process has its own cache; other workers see changes after the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._keys_by_user: dict[Hashable, set[tuple]] = {}
+        self._generation: dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> Any:
+        """Return the cached value for key (key[0] is the user), or MISSING."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: tuple, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+        while len(self._data) > self.max_entries:
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def generation(self, user: Hashable) -> int:
+        return self._generation.get(user, 0)
+
+    def invalidate_user(self, user: Hashable) -> None:
+        """Drop every entry for user; in-flight computations for them will not be stored."""
+        self._generation[user] = self.generation(user) + 1
+        for key in self._keys_by_user.pop(user, set()):
+            self._data.pop(key, None)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._keys_by_user.clear()
+        self._generation.clear()
+
+    def _drop(self, key: tuple) -> None:
+        self._data.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def cached(self, name: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        """Decorate an async function whose first argument is the user id."""
+
+        def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @wraps(fn)
+            async def wrapper(user_id, *args, **kwargs):
+                key = (user_id, name, args, tuple(sorted(kwargs.items())))
+                value = self.get(key)
+                if value is not MISSING:
+                    return value
+                generation = self.generation(user_id)
+                value = await fn(user_id, *args, **kwargs)
+                if self.generation(user_id) == generation:
+                    self.set(key, value)
+                return value
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Hashable
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request waited in the queue past its deadline."""
+
+
+class TokenBucket:
+    """Refills at `per_minute` units per minute up to `per_minute` (one minute of burst)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversized requests wait for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+@dataclass
+class _Waiter:
+    user: Hashable
+    tokens: int
+    enqueued: float
+    future: asyncio.Future = field(repr=False)
+
+
+class FairRateLimiter:
+    """
+    Global and per-user token buckets, measured in requests and in estimated tokens.
+    Callers that cannot go immediately wait in per-user FIFO queues that are served
+    round-robin, so one busy user cannot starve the others. A caller whose deadline
+    passes is removed from the queue and gets RateLimitExceeded.
+    """
+
+    def __init__(
+        self,
+        global_rpm: int,
+        global_tpm: int,
+        user_rpm: int,
+        user_tpm: int,
+        max_idle_users: int = 10_000,
+    ):
+        self._global_requests = TokenBucket(global_rpm)
+        self._global_tokens = TokenBucket(global_tpm)
+        self._user_rpm = user_rpm
+        self._user_tpm = user_tpm
+        self._user_buckets: OrderedDict[Hashable, tuple[TokenBucket, TokenBucket]] = OrderedDict()
+        self._max_idle_users = max_idle_users
+        self._queues: OrderedDict[Hashable, deque[_Waiter]] = OrderedDict()
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self.granted = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _buckets_for(self, user: Hashable) -> tuple[TokenBucket, TokenBucket]:
+        buckets = self._user_buckets.get(user)
+        if buckets is None:
+            buckets = (TokenBucket(self._user_rpm), TokenBucket(self._user_tpm))
+            self._user_buckets[user] = buckets
+            if len(self._user_buckets) > self._max_idle_users:
+                self._user_buckets.popitem(last=False)
+        self._user_buckets.move_to_end(user)
+        return buckets
+
+    def _try_grant(self, waiter: _Waiter, now: float) -> float:
+        """Grant the waiter if every bucket allows it; otherwise return seconds to wait."""
+        user_requests, user_tokens = self._buckets_for(waiter.user)
+        wait = max(
+            self._global_requests.wait_time(1, now),
+            self._global_tokens.wait_time(waiter.tokens, now),
+            user_requests.wait_time(1, now),
+            user_tokens.wait_time(waiter.tokens, now),
+        )
+        if wait > 0:
+            return wait
+        for bucket in (self._global_requests, user_requests):
+            bucket.consume(1)
+        for bucket in (self._global_tokens, user_tokens):
+            bucket.consume(waiter.tokens)
+        waited = now - waiter.enqueued
+        self.granted += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        waiter.future.set_result(None)
+        return 0.0
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            next_wait = float("inf")
+            granted_any = False
+            # One pass over users in round-robin order; each user's head waiter gets a chance
+            for user in list(self._queues):
+                queue = self._queues[user]
+                while queue and queue[0].future.done():
+                    queue.popleft()  # timed out or cancelled
+                if not queue:
+                    del self._queues[user]
+                    continue
+                wait = self._try_grant(queue[0], time.monotonic())
+                if wait == 0:
+                    granted_any = True
+                    queue.popleft()
+                    # Served users move to the back of the rotation
+                    self._queues.move_to_end(user)
+                    if not queue:
+                        del self._queues[user]
+                else:
+                    next_wait = min(next_wait, wait)
+            if granted_any and self._queues:
+                continue
+            if not self._queues or next_wait == float("inf"):
+                await self._wakeup.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def acquire(self, user: Hashable, tokens: int, timeout: float) -> None:
+        """Wait (up to timeout seconds) until user may send a request of ~tokens tokens."""
+        self._ensure_dispatcher()
+        waiter = _Waiter(
+            user=user,
+            tokens=tokens,
+            enqueued=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._queues.setdefault(user, deque()).append(waiter)
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self.rejected += 1
+                raise RateLimitExceeded(f"LLM rate limit queue wait exceeded {timeout:.0f}s")
+        except asyncio.CancelledError:
+            waiter.future.cancel()
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "queued": sum(1 for q in self._queues.values() for w in q if not w.future.done()),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.granted, 3) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
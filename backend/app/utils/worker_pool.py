@@ -0,0 +1,79 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+
+class BoundedExecutor:
+    """
+    Run blocking/CPU-bound callables off the event loop in a process (or thread) pool.
+    At most max_workers jobs run at once; the rest wait on a semaphore and are
+    counted as queued. The pool is created lazily on first use, and recreated on the
+    next call if a child process died (BrokenProcessPool).
+    """
+
+    def __init__(self, max_workers: int, use_processes: bool = True):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in the pool. With processes, fn and args must be picklable."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self.failed += 1
+            # A child was killed (OOM, segfault); the pool is unusable from now on
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.restarts += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+        self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "mode": "process" if self.use_processes else "thread",
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,49 @@
+"""
+Test fixtures. Tests run against an in-memory mongomock database by default; set
+MONGODB_TEST_URL to run them against a real MongoDB server instead.
+"""
+import os
+import uuid
+
+import pytest
+
+# Settings require these at import time
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from beanie import init_beanie  # noqa: E402
+
+from app.database import document_models  # noqa: E402
+
+MONGODB_TEST_URL = os.getenv("MONGODB_TEST_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    if MONGODB_TEST_URL:
+        return
+    skip = pytest.mark.skip(reason="needs a MongoDB server (set MONGODB_TEST_URL)")
+    for item in items:
+        if "mongodb" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+async def db():
+    if MONGODB_TEST_URL:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(MONGODB_TEST_URL)
+        database = client[f"expense_tracker_test_{uuid.uuid4().hex[:8]}"]
+    else:
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        client = mongomock_motor.AsyncMongoMockClient()
+        database = client["expense_tracker_test"]
+    await init_beanie(database=database, document_models=document_models)
+    if not MONGODB_TEST_URL:
+        # mongomock ignores partialFilterExpression, so this index would also
+        # reject manual expenses (recurring_rule_id=None) on the same date
+        await database["expenses"].drop_index("recurring_rule_id_1_date_1")
+    yield database
+    if MONGODB_TEST_URL:
+        await client.drop_database(database.name)
+    client.close()
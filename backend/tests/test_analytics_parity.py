@@ -0,0 +1,132 @@
+"""
+The aggregation pipelines (and the rollups built from them) must return exactly the
+totals the old per-expense Python sums did, including Decimal128 precision.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.category import Category
+from app.models.expense import Expense
+from app.services.analytics import (
+    get_category_distribution,
+    get_daily_breakdown,
+    get_dashboard,
+    get_monthly_total,
+    get_spending_trend,
+)
+from app.services.rollup import rollup_service
+
+# Mixed scale and magnitude, so float summation would visibly drift
+AMOUNTS = ["0.1", "0.2", "19.99", "1234567.891", "3.3333", "0.005", "100", "0.07"]
+PREVIOUS_MONTH_AMOUNTS = ["0.33", "2.675", "1000000.001"]
+
+
+def _previous_month_day() -> date:
+    return date.today().replace(day=1) - timedelta(days=1)
+
+
+async def _seed(user_id: PydanticObjectId) -> tuple[list[Expense], list[PydanticObjectId]]:
+    today = date.today()
+    categories = [Category(name=f"Cat {i}", slug=f"cat-{i}", user_id=user_id) for i in range(3)]
+    for c in categories:
+        await c.insert()
+    expenses = [
+        Expense(
+            user_id=user_id,
+            category_id=categories[i % 3].id,
+            amount=Decimal(amount),
+            date=today.replace(day=1 + i % 2),
+        )
+        for i, amount in enumerate(AMOUNTS)
+    ]
+    # Outside the current month: the previous month (for the trend) and another user
+    expenses += [
+        Expense(user_id=user_id, category_id=categories[0].id, amount=Decimal(a), date=_previous_month_day())
+        for a in PREVIOUS_MONTH_AMOUNTS
+    ]
+    expenses.append(
+        Expense(user_id=PydanticObjectId(), category_id=categories[0].id, amount=Decimal("7.77"), date=today)
+    )
+    for e in expenses:
+        await e.insert()
+    # Built by the same $group aggregation the verify/rebuild job uses
+    await rollup_service.rebuild(user_id)
+    return expenses, [c.id for c in categories]
+
+
+def _python_sums(expenses: list[Expense], user_id: PydanticObjectId, month: int, year: int):
+    """The pre-aggregation implementation: load the month's expenses and sum in Python."""
+    in_month = [
+        e for e in expenses
+        if e.user_id == user_id and e.date.month == month and e.date.year == year
+    ]
+    total = sum((e.amount for e in in_month), Decimal("0"))
+    by_category: dict[PydanticObjectId, Decimal] = defaultdict(Decimal)
+    by_day: dict[int, list[Decimal]] = defaultdict(list)
+    for e in in_month:
+        by_category[e.category_id] += e.amount
+        by_day[e.date.day].append(e.amount)
+    return total, dict(by_category), {d: (sum(a, Decimal("0")), len(a)) for d, a in by_day.items()}
+
+
+async def test_monthly_aggregations_match_python_sums(db):
+    user_id = PydanticObjectId()
+    expenses, _ = await _seed(user_id)
+    today = date.today()
+    total, by_category, by_day = _python_sums(expenses, user_id, today.month, today.year)
+    assert total == sum((Decimal(a) for a in AMOUNTS), Decimal("0"))
+
+    monthly = await get_monthly_total(user_id, today.month, today.year)
+    assert monthly.total == total
+
+    distribution = await get_category_distribution(user_id, today.month, today.year)
+    assert distribution.total == total
+    assert {PydanticObjectId(c.category_id): c.total for c in distribution.by_category} == by_category
+
+    daily = await get_daily_breakdown(user_id, today.month, today.year)
+    assert daily.total == total
+    assert {d.day: (d.total, d.transaction_count) for d in daily.by_day} == by_day
+
+    # The trend starts at the previous month
+    previous = _previous_month_day()
+    previous_total, _, _ = _python_sums(expenses, user_id, previous.month, previous.year)
+    trend = await get_spending_trend(user_id, months_back=3)
+    points = {(p.year, p.month): p.total for p in trend.points}
+    assert points[(previous.year, previous.month)] == previous_total
+    assert previous_total == sum((Decimal(a) for a in PREVIOUS_MONTH_AMOUNTS), Decimal("0"))
+
+
+@pytest.mark.mongodb  # mongomock cannot $sort Decimal128 values
+async def test_dashboard_matches_python_sums(db):
+    user_id = PydanticObjectId()
+    expenses, _ = await _seed(user_id)
+    today = date.today()
+    total, by_category, by_day = _python_sums(expenses, user_id, today.month, today.year)
+
+    dashboard = await get_dashboard(user_id, today.month, today.year)
+    assert dashboard.monthly_total.total == total
+    assert {
+        PydanticObjectId(c.category_id): c.total for c in dashboard.category_distribution.by_category
+    } == by_category
+    assert {d.day: (d.total, d.transaction_count) for d in dashboard.daily_breakdown.by_day} == by_day
+
+
+@pytest.mark.mongodb  # mongomock cannot $inc Decimal128 values
+async def test_rollups_verify_clean_after_incremental_updates(db):
+    user_id = PydanticObjectId()
+    expenses, _ = await _seed(user_id)
+    assert await rollup_service.verify(user_id) == []
+
+    # Move one expense to another month and delete another; rollups must follow exactly
+    moved = expenses[3]
+    before = moved.model_copy()
+    moved.date = _previous_month_day()
+    await moved.save()
+    await rollup_service.apply_change(before, moved)
+    await expenses[0].delete()
+    await rollup_service.apply_change(expenses[0], None)
+    assert await rollup_service.verify(user_id) == []
@@ -0,0 +1,59 @@
+"""Behavior snapshots: fallback results are not stored, and edits anywhere in the window invalidate."""
+from datetime import date
+from decimal import Decimal
+
+from beanie import PydanticObjectId
+
+from app.models.behavior_snapshot import BehaviorAnalysisSnapshot
+from app.models.expense import Expense
+from app.models.monthly_rollup import MonthlyRollup
+from app.services import behavior_snapshot, llm_analysis
+from app.services.behavior_snapshot import get_behavior_analysis
+from app.services.rollup import rollup_service
+
+
+async def _seed_closed_month(user_id: PydanticObjectId) -> tuple[int, int]:
+    month, year = behavior_snapshot.previous_month()
+    await Expense(
+        user_id=user_id, category_id=PydanticObjectId(), amount=Decimal("42"), date=date(year, month, 10)
+    ).insert()
+    await rollup_service.rebuild(user_id)
+    return month, year
+
+
+async def test_fallback_analysis_is_not_stored(db, monkeypatch):
+    async def failing_llm(*args, **kwargs):
+        return "Unable to generate insight at this time."
+
+    monkeypatch.setattr(llm_analysis, "_call_llm", failing_llm)
+    user_id = PydanticObjectId()
+    month, year = await _seed_closed_month(user_id)
+
+    await get_behavior_analysis(user_id, month, year)
+
+    assert await BehaviorAnalysisSnapshot.find_one() is None
+
+
+async def test_snapshot_is_stale_after_edit_in_baseline_month(db, monkeypatch):
+    async def llm(*args, **kwargs):
+        return '{"summary": "Steady month."}'
+
+    monkeypatch.setattr(llm_analysis, "_call_llm", llm)
+    user_id = PydanticObjectId()
+    month, year = await _seed_closed_month(user_id)
+
+    await get_behavior_analysis(user_id, month, year)
+    assert await behavior_snapshot._load_current(user_id, month, year) is not None
+
+    # An expense edited two months earlier changes the spike baseline
+    baseline_year, baseline_month = behavior_snapshot._window_months(month, year)[0]
+    await MonthlyRollup(
+        user_id=user_id,
+        year=baseline_year,
+        month=baseline_month,
+        category_id=PydanticObjectId(),
+        total=Decimal("5"),
+        expense_count=1,
+    ).insert()
+
+    assert await behavior_snapshot._load_current(user_id, month, year) is None
@@ -0,0 +1,24 @@
+"""Category name lookups stay correct when the cache is full."""
+from collections import OrderedDict
+
+from beanie import PydanticObjectId
+
+from app.models.category import Category
+from app.services import category as category_module
+from app.services.category import category_service
+
+
+async def test_names_resolve_when_cache_overflows(db, monkeypatch):
+    monkeypatch.setattr(category_module, "_CATEGORY_NAME_CACHE_MAX", 2)
+    monkeypatch.setattr(category_module, "_category_names", OrderedDict())
+    categories = [Category(name=f"Cat {n}", slug=f"cat-{n}", type="system") for n in range(3)]
+    for c in categories:
+        await c.insert()
+    ids = [c.id for c in categories]
+
+    await category_service.names(ids[:2])
+    names = await category_service.names(ids + [PydanticObjectId()])
+
+    assert [names[i] for i in ids] == ["Cat 0", "Cat 1", "Cat 2"]
+    assert list(names.values())[-1] == "Unknown"
+    assert len(category_module._category_names) == 2
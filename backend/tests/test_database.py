@@ -0,0 +1,12 @@
+"""Startup index maintenance."""
+from app.database import init_database
+
+
+async def test_superseded_expense_index_is_dropped(db):
+    await db["expenses"].create_index([("user_id", 1), ("date", -1)])
+
+    await init_database(db)
+
+    indexes = await db["expenses"].index_information()
+    assert "user_id_1_date_-1" not in indexes
+    assert "user_id_1_date_-1__id_-1" in indexes
@@ -0,0 +1,62 @@
+"""Duplicate generated expenses: cleaned up before the unique index is built, 409 on manual writes."""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from beanie import PydanticObjectId
+from bson import Decimal128
+from fastapi import HTTPException
+
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.services.expense import create_expense, update_expense
+from app.services.recurring_dedupe import RECURRING_UNIQUE_INDEX, remove_duplicate_recurring_expenses
+from app.services.rollup import rollup_service
+
+
+async def _ensure_unique_index(db) -> None:
+    # The mongomock fixture drops it because it cannot honour the partial filter
+    if RECURRING_UNIQUE_INDEX not in await db["expenses"].index_information():
+        await db["expenses"].create_index([("recurring_rule_id", 1), ("date", 1)], unique=True)
+
+
+async def test_duplicates_are_removed_keeping_the_oldest(db):
+    expenses = db["expenses"]
+    if RECURRING_UNIQUE_INDEX in await expenses.index_information():
+        await expenses.drop_index(RECURRING_UNIQUE_INDEX)
+    user_id, rule_id = PydanticObjectId(), PydanticObjectId()
+    day = datetime(2024, 3, 1)
+    doc = {"user_id": user_id, "category_id": PydanticObjectId(), "amount": Decimal128("9.99"), "date": day}
+    ids = [PydanticObjectId() for _ in range(3)]
+    await expenses.insert_many([{**doc, "_id": i, "recurring_rule_id": rule_id} for i in ids])
+    await expenses.insert_many([{**doc, "recurring_rule_id": None}, {**doc, "recurring_rule_id": None}])
+
+    assert await remove_duplicate_recurring_expenses(db) == {user_id}
+
+    remaining = await expenses.find({"recurring_rule_id": rule_id}).to_list(None)
+    assert [d["_id"] for d in remaining] == [min(ids)]
+    assert await expenses.count_documents({"recurring_rule_id": None}) == 2
+
+
+async def test_manual_duplicate_of_generated_expense_is_a_conflict(db, monkeypatch):
+    async def skip_rollups(before, after):
+        pass
+
+    # mongomock cannot $inc Decimal128 rollup totals; rollups are not under test here
+    monkeypatch.setattr(rollup_service, "apply_change", skip_rollups)
+    await _ensure_unique_index(db)
+    user_id, rule_id = PydanticObjectId(), PydanticObjectId()
+    payload = ExpenseCreate(
+        category_id=str(PydanticObjectId()),
+        amount=Decimal("5"),
+        date=date(2024, 3, 1),
+        recurring_rule_id=str(rule_id),
+    )
+    await create_expense(user_id, payload)
+    other = await create_expense(user_id, payload.model_copy(update={"date": date(2024, 3, 2)}))
+
+    with pytest.raises(HTTPException) as exc:
+        await create_expense(user_id, payload)
+    assert exc.value.status_code == 409
+    with pytest.raises(HTTPException) as exc:
+        await update_expense(other.id, user_id, ExpenseUpdate(date=date(2024, 3, 1)))
+    assert exc.value.status_code == 409
@@ -0,0 +1,75 @@
+"""The recurring timer backs off instead of spinning, and only the leader arms it."""
+import asyncio
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from beanie import PydanticObjectId
+
+from app.models.recurring_rule import RecurringRule
+from app.services import recurring_scheduler as scheduler_module
+from app.services.recurring_scheduler import RecurringScheduler
+from app.utils import utc_now
+
+
+def _scheduler(is_leader: bool) -> RecurringScheduler:
+    scheduler = RecurringScheduler(SimpleNamespace(is_leader=is_leader, ttl_seconds=30))
+
+    async def reload():
+        # A rule that stays due, as when processing keeps failing
+        scheduler._heap = [utc_now() - timedelta(minutes=1)]
+        scheduler._armed = True
+
+    scheduler.reload = reload
+    return scheduler
+
+
+async def test_failing_runs_back_off(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "RETRY_BACKOFF_SECONDS", 0.02)
+    calls = 0
+
+    async def process_due(now):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("database unavailable")
+
+    scheduler = _scheduler(is_leader=True)
+    scheduler.start(process_due)
+    await asyncio.sleep(0.2)
+    await scheduler.stop()
+
+    # 0.02 + 0.04 + 0.08 = 0.14s of backoff fits about four runs, not a tight loop
+    assert 2 <= calls <= 5
+    assert scheduler.stats()["failures"] == calls
+
+
+async def test_notify_is_ignored_by_followers():
+    scheduler = _scheduler(is_leader=False)
+    scheduler.notify(utc_now())
+    assert scheduler.stats()["heap_size"] == 0
+
+
+async def test_rule_created_on_a_follower_runs_without_waiting_for_the_sweep(db):
+    lease = SimpleNamespace(is_leader=True, ttl_seconds=3)  # wakes every second
+    leader = RecurringScheduler(lease)
+    ran = asyncio.Event()
+
+    async def process_due(now):
+        ran.set()
+        await RecurringRule.get_motor_collection().update_many({}, {"$set": {"next_run_at": now + timedelta(days=1)}})
+        return 1
+
+    leader.start(process_due)
+    await asyncio.sleep(0.05)  # armed with an empty heap
+    rule = RecurringRule(
+        user_id=PydanticObjectId(),
+        category_id=PydanticObjectId(),
+        amount=Decimal("5"),
+        frequency="daily",
+        next_run_at=utc_now(),
+    )
+    await rule.insert()
+    _scheduler(is_leader=False).notify(rule.next_run_at)  # the follower cannot arm the leader
+
+    await asyncio.wait_for(ran.wait(), timeout=3)
+    await leader.stop()
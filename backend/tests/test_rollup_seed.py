@@ -0,0 +1,82 @@
+"""Rollups are built automatically on first start instead of reading as zero."""
+from datetime import date
+from decimal import Decimal
+
+from beanie import PydanticObjectId
+
+from app.database import init_database
+from app.models.expense import Expense
+from app.models.monthly_rollup import MonthlyRollup
+from app.services.analytics import get_monthly_total
+from app.services.recurring_dedupe import RECURRING_UNIQUE_INDEX
+from app.services.rollup import rollup_service
+
+
+async def test_empty_rollups_are_seeded_from_expenses(db):
+    user_id = PydanticObjectId()
+    today = date.today()
+    for amount in ["10.01", "0.333", "250"]:
+        await Expense(
+            user_id=user_id, category_id=PydanticObjectId(), amount=Decimal(amount), date=today
+        ).insert()
+    assert await MonthlyRollup.find_one() is None
+
+    await rollup_service.ensure_seeded()
+
+    monthly = await get_monthly_total(user_id, today.month, today.year)
+    assert monthly.total == Decimal("260.343")
+    assert await rollup_service.verify(user_id) == []
+
+
+async def test_seeding_runs_once(db):
+    user_id = PydanticObjectId()
+    today = date.today()
+    await Expense(user_id=user_id, category_id=PydanticObjectId(), amount=Decimal("5"), date=today).insert()
+    await rollup_service.mark_seeded()
+    await MonthlyRollup(
+        user_id=user_id,
+        year=today.year,
+        month=today.month,
+        category_id=PydanticObjectId(),
+        total=Decimal("1"),
+        expense_count=1,
+    ).insert()
+
+    await rollup_service.ensure_seeded()
+
+    assert await MonthlyRollup.count() == 1
+
+
+async def test_single_user_rebuild_does_not_count_as_seeded(db):
+    today = date.today()
+    users = [PydanticObjectId(), PydanticObjectId()]
+    for user_id in users:
+        await Expense(user_id=user_id, category_id=PydanticObjectId(), amount=Decimal("10"), date=today).insert()
+    await rollup_service.rebuild(users[0])
+
+    await rollup_service.ensure_seeded()
+
+    for user_id in users:
+        assert (await get_monthly_total(user_id, today.month, today.year)).total == Decimal("10")
+
+
+async def test_startup_with_duplicate_recurring_expenses_seeds_every_user(db):
+    expenses = db["expenses"]
+    if RECURRING_UNIQUE_INDEX in await expenses.index_information():
+        await expenses.drop_index(RECURRING_UNIQUE_INDEX)
+    today = date.today()
+    with_duplicates, without = PydanticObjectId(), PydanticObjectId()
+    generated = dict(
+        user_id=with_duplicates, category_id=PydanticObjectId(), amount=Decimal("10"),
+        date=today, recurring_rule_id=PydanticObjectId(),
+    )
+    await Expense(**generated).insert()
+    await Expense(**generated).insert()
+    await Expense(user_id=without, category_id=PydanticObjectId(), amount=Decimal("10"), date=today).insert()
+
+    # The same sequence as lifespan: init_db, then ensure_seeded
+    await init_database(db)
+    await rollup_service.ensure_seeded()
+
+    for user_id in (with_duplicates, without):
+        assert (await get_monthly_total(user_id, today.month, today.year)).total == Decimal("10")
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from app.utils.worker_pool import BoundedExecutor
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _die() -> None:
+    os._exit(1)
+
+
+async def test_pool_recovers_after_child_process_dies():
+    pool = BoundedExecutor(max_workers=1, use_processes=True)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(_die)
+        assert await pool.run(_square, 7) == 49
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.shutdown()
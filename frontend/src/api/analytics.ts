@@ -1,4 +1,4 @@
-import type { MonthlyTotal, CategoryDistribution, SpendingTrend, DailyBreakdown } from '../types'
+import type { MonthlyTotal, CategoryDistribution, SpendingTrend, DailyBreakdown, Dashboard } from '../types'
 import { apiGet } from './client'
 
 export interface SpendingSpike {
@@ -61,6 +61,10 @@ export function getDailyBreakdown(month: number, year: number): Promise<DailyBre
   return apiGet<DailyBreakdown>(`/analytics/daily-breakdown?month=${month}&year=${year}`)
 }
 
+export function getDashboard(month: number, year: number): Promise<Dashboard> {
+  return apiGet<Dashboard>(`/analytics/dashboard?month=${month}&year=${year}`)
+}
+
 export function getBehaviorAnalysis(month: number, year: number): Promise<BehaviorAnalysis> {
   return apiGet<BehaviorAnalysis>(`/analytics/behavior?month=${month}&year=${year}`)
 }
@@ -1,9 +1,8 @@
 import { useEffect, useState } from 'react'
 import { Link } from 'react-router-dom'
 import { Wallet, Download, FileText, TrendingUp, TrendingDown, FolderOpen, Activity } from 'lucide-react'
-import { getMonthlyTotal, getCategoryDistribution, getSpendingTrend, getDailyBreakdown } from '../api/analytics'
+import { getDashboard, getSpendingTrend, getDailyBreakdown } from '../api/analytics'
 import { listExpenses } from '../api/expenses'
-import { listBudgets } from '../api/budgets'
 import { downloadExpensesCsv, downloadSummaryPdf } from '../api/export'
 import type { MonthlyTotal, CategoryDistribution, SpendingTrend, Expense, BudgetWithActual, DailyBreakdown } from '../types'
 import { LoadingState } from '../components/LoadingState'
@@ -47,22 +46,21 @@ export function Dashboard() {
     let cancelled = false
     setLoading(true)
     setError('')
+    const isCurrentMonth = calendarMonth === thisMonth && calendarYear === thisYear
     Promise.all([
-      getMonthlyTotal(thisMonth, thisYear),
-      getCategoryDistribution(thisMonth, thisYear),
+      getDashboard(thisMonth, thisYear),
       getSpendingTrend(6),
       listExpenses({ limit: 8 }),
-      listBudgets({ month: thisMonth, year: thisYear, include_actual: true }),
-      getDailyBreakdown(calendarMonth, calendarYear),
+      isCurrentMonth ? null : getDailyBreakdown(calendarMonth, calendarYear),
     ])
-      .then(([m, c, t, r, b, d]) => {
+      .then(([dash, t, r, d]) => {
         if (!cancelled) {
-          setMonthly(m)
-          setByCategory(c)
+          setMonthly(dash.monthly_total)
+          setByCategory(dash.category_distribution)
           setTrend(t)
           setRecent(r)
-          setBudgets(Array.isArray(b) ? b : [])
-          setDaily(d)
+          setBudgets(dash.budgets)
+          setDaily(d ?? dash.daily_breakdown)
         }
       })
       .catch((err) => !cancelled && setError(err instanceof Error ? err.message : 'Failed to load'))
@@ -74,18 +72,16 @@ export function Dashboard() {
     setError('')
     setLoading(true)
     Promise.all([
-      getMonthlyTotal(thisMonth, thisYear),
-      getCategoryDistribution(thisMonth, thisYear),
+      getDashboard(thisMonth, thisYear),
       getSpendingTrend(6),
       listExpenses({ limit: 8 }),
-      listBudgets({ month: thisMonth, year: thisYear, include_actual: true }),
     ])
-      .then(([m, c, t, r, b]) => {
-        setMonthly(m)
-        setByCategory(c)
+      .then(([dash, t, r]) => {
+        setMonthly(dash.monthly_total)
+        setByCategory(dash.category_distribution)
         setTrend(t)
         setRecent(r)
-        setBudgets(Array.isArray(b) ? b : [])
+        setBudgets(dash.budgets)
       })
       .catch((err) => setError(err instanceof Error ? err.message : 'Failed to load'))
       .finally(() => setLoading(false))
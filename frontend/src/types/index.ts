@@ -118,3 +118,13 @@ export interface DailyBreakdown {
   currency: string
   by_day: DailyBreakdownItem[]
 }
+
+export interface Dashboard {
+  month: number
+  year: number
+  currency: string
+  monthly_total: MonthlyTotal
+  category_distribution: CategoryDistribution
+  daily_breakdown: DailyBreakdown
+  budgets: BudgetWithActual[]
+}